@@ -226,6 +226,29 @@ export class SemanticAnnotator {
     };
   }
 
+  /**
+   * Annotate a batch of blocks in one pass, keyed by blockId.
+   *
+   * Blocks with identical source, tags and category share one annotation,
+   * so repeated snippets run the pattern libraries only once.
+   */
+  extractAnnotations(blocks: CodeBlock[]): Map<string, SemanticAnnotation> {
+    const annotations = new Map<string, SemanticAnnotation>();
+    const byContent = new Map<string, SemanticAnnotation>();
+
+    for (const block of blocks) {
+      const key = `${block.category}\0${(block.tags ?? []).join(' ')}\0${block.sourceCode}`;
+      let annotation = byContent.get(key);
+      if (!annotation) {
+        annotation = this.extractAnnotation(block);
+        byContent.set(key, annotation);
+      }
+      annotations.set(block.blockId, annotation);
+    }
+
+    return annotations;
+  }
+
   private _extractOperations(code: string): Set<string> {
     const operations = new Set<string>();
     for (const [pattern, op] of ALL_OPERATION_PATTERNS) {
@@ -217,7 +217,7 @@ export function deduplicateBlocks(blocks: CodeBlock[]): CodeBlock[] {
     const block = blocks[i];
     const functionName = _getFunctionNameFromTags(block.tags);
 
-    if (i < BLOCK_EXTRACTION.DEBUG_LOG_DEDUP_LIMIT) {
+    if (DEBUG && i < BLOCK_EXTRACTION.DEBUG_LOG_DEDUP_LIMIT) {
       _debug(`dedup block ${i}: ${block.location.filePath}:${block.location.lineStart}, func=${functionName}`);
     }
 
@@ -233,7 +233,7 @@ export function deduplicateBlocks(blocks: CodeBlock[]): CodeBlock[] {
         if (idx !== -1) uniqueBlocks.splice(idx, 1);
         seenFunctions.set(functionKey, block);
         uniqueBlocks.push(block);
-      } else {
+      } else if (DEBUG) {
         _debug(`dedup: skipping duplicate ${functionName} at line ${block.location.lineStart} (kept line ${existing.location.lineStart})`);
       }
     } else {
@@ -325,13 +325,13 @@ export function extractCodeBlocks(
 
   for (let i = 0; i < patternMatches.length; i++) {
     const match = patternMatches[i];
-    if (i === 0) {
+    if (DEBUG && i === 0) {
       _debug(`first match: file_path=${match.file_path}, line_start=${match.line_start}`);
     }
 
     try {
       const block = _createCodeBlock(match, repositoryInfo);
-      if (i < BLOCK_EXTRACTION.DEBUG_LOG_BLOCK_LIMIT) {
+      if (DEBUG && i < BLOCK_EXTRACTION.DEBUG_LOG_BLOCK_LIMIT) {
         _debug(`block created: file=${block.relativePath}, line=${block.location.lineStart}, tags=${block.tags}`);
       }
       blocks.push(block);
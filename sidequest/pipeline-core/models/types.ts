@@ -192,12 +192,16 @@ export interface ConsolidationSuggestion {
   roiScore?: number;
 }
 
+/**
+ * Blocks with identical content share one annotation (see
+ * SemanticAnnotator.extractAnnotations), so its tag sets are read-only.
+ */
 export interface SemanticAnnotation {
   category: string;
-  operations: Set<string>;
-  domains: Set<string>;
-  patterns: Set<string>;
-  dataTypes: Set<string>;
+  operations: ReadonlySet<string>;
+  domains: ReadonlySet<string>;
+  patterns: ReadonlySet<string>;
+  dataTypes: ReadonlySet<string>;
   intent: string;
 }
 
@@ -205,10 +209,14 @@ export interface SemanticAnnotation {
 // Computed Field Functions
 // ---------------------------------------------------------------------------
 
+/** Collapse whitespace runs; the content hash is taken over this form. */
+export function normalizeContentWhitespace(sourceCode: string): string {
+  return sourceCode.split(/\s+/).join(' ');
+}
+
 export function computeContentHash(sourceCode: string): string {
-  const normalized = sourceCode.split(/\s+/).join(' ');
   return createHash('sha256')
-    .update(normalized)
+    .update(normalizeContentWhitespace(sourceCode))
     .digest('hex')
     .slice(0, SCAN_DEFAULTS.CONTENT_HASH_LENGTH);
 }
@@ -15,15 +15,18 @@ import type {
   DuplicateGroup,
   SemanticAnnotation,
 } from '../models/types.ts';
-import { computeContentHash } from '../models/types.ts';
+import { computeContentHash, normalizeContentWhitespace } from '../models/types.ts';
 import { SIMILARITY_CONFIG } from './config.ts';
 import { SEMANTIC_WEIGHTS } from '../pipeline-constants.ts';
 import {
-  calculateStructuralSimilarity,
+  buildStructuralProfile,
+  compareStructuralProfiles,
   extractLogicalOperators,
   extractHttpStatusCodes,
   extractSemanticMethods,
   extractMethodChain,
+  popcount32,
+  type StructuralProfile,
 } from './structural.ts';
 import {
   areSemanticallyCompatible,
@@ -33,14 +36,25 @@ import { SemanticAnnotator } from '../annotators/semantic-annotator.ts';
 
 const DEBUG = SIMILARITY_CONFIG.DEBUG;
 
-function _stderr(message: string): void {
-  process.stderr.write(`${message}\n`);
+// Stateless, so one instance is shared across groupBySimilarity calls
+const annotator = new SemanticAnnotator(DEBUG);
+
+function _debug(message: string): void {
+  if (DEBUG) process.stderr.write(`DEBUG ${message}\n`);
 }
 
+// Bit per equality operator, so opposite-pair checks are two mask tests
+const OPERATOR_BITS: Record<string, number> = {
+  '===': 1,
+  '!==': 2,
+  '==': 4,
+  '!=': 8,
+};
+
 // Opposite logical operator pairs for semantic validation
-const OPPOSITE_OPERATOR_PAIRS: Array<[Set<string>, Set<string>]> = [
-  [new Set(['===']), new Set(['!=='])],
-  [new Set(['==']), new Set(['!='])],
+const OPPOSITE_OPERATOR_MASKS: Array<[number, number]> = [
+  [OPERATOR_BITS['==='], OPERATOR_BITS['!==']],
+  [OPERATOR_BITS['=='], OPERATOR_BITS['!=']],
 ];
 
 // ---------------------------------------------------------------------------
@@ -74,10 +88,12 @@ function _checkHttpStatusCodes(code1: string, code2: string): SemanticCheckResul
 function _checkLogicalOperators(code1: string, code2: string): SemanticCheckResult {
   const ops1 = extractLogicalOperators(code1);
   const ops2 = extractLogicalOperators(code2);
-  for (const [pair1, pair2] of OPPOSITE_OPERATOR_PAIRS) {
+  const mask1 = _operatorMask(ops1);
+  const mask2 = _operatorMask(ops2);
+  for (const [bit1, bit2] of OPPOSITE_OPERATOR_MASKS) {
     const hasOpposite =
-      (isSubset(pair1, ops1) && isSubset(pair2, ops2)) ||
-      (isSubset(pair2, ops1) && isSubset(pair1, ops2));
+      ((mask1 & bit1) !== 0 && (mask2 & bit2) !== 0) ||
+      ((mask1 & bit2) !== 0 && (mask2 & bit1) !== 0);
     if (hasOpposite) {
       return { isValid: false, reason: 'opposite_logic', details: [[...ops1], [...ops2]] };
     }
@@ -123,11 +139,12 @@ function setsEqual<T>(a: Set<T>, b: Set<T>): boolean {
   return true;
 }
 
-function isSubset<T>(subset: Set<T>, superset: Set<T>): boolean {
-  for (const item of subset) {
-    if (!superset.has(item)) return false;
+function _operatorMask(operators: Set<string>): number {
+  let mask = 0;
+  for (const op of operators) {
+    mask |= OPERATOR_BITS[op] ?? 0;
   }
-  return true;
+  return mask;
 }
 
 // ---------------------------------------------------------------------------
@@ -217,8 +234,8 @@ export function validateExactGroupSemantics(
         groupBlocks[j].sourceCode
       );
       if (!result.isValid) {
-        if (result.details) {
-          _stderr(`       ${result.details[0]} vs ${result.details[1]}`);
+        if (DEBUG && result.details) {
+          _debug(`       ${result.details[0]} vs ${result.details[1]}`);
         }
         return [false, `${result.reason}: ${result.details?.[0]} vs ${result.details?.[1]}`];
       }
@@ -271,8 +288,8 @@ export function groupBySimilarity(
   const complexBlocks = blocks.filter(isComplexEnough);
   const trivialCount = blocks.length - complexBlocks.length;
 
-  if (trivialCount > 0) {
-    _stderr(`Layer 0: Filtered ${trivialCount} trivial blocks (below complexity threshold)`);
+  if (DEBUG && trivialCount > 0) {
+    _debug(`Layer 0: Filtered ${trivialCount} trivial blocks (below complexity threshold)`);
   }
 
   const groups: DuplicateGroup[] = [];
@@ -305,11 +322,7 @@ export function groupBySimilarity(
   const ungroupedL3 = complexBlocks.filter((b) => !groupedBlockIds.has(b.blockId));
 
   if (ungroupedL3.length > 0) {
-    const annotator = new SemanticAnnotator(DEBUG);
-    const annotations = new Map<string, SemanticAnnotation>();
-    for (const block of ungroupedL3) {
-      annotations.set(block.blockId, annotator.extractAnnotation(block));
-    }
+    const annotations = annotator.extractAnnotations(ungroupedL3);
 
     const semanticGroups = _groupBySemanticSimilarity(
       ungroupedL3,
@@ -321,7 +334,7 @@ export function groupBySimilarity(
       _tryAcceptGroup(groupBlocks, simScore, 'semantic', groups, groupedBlockIds, 'Layer 3');
     }
   } else {
-    _stderr('Layer 3: No ungrouped blocks remaining');
+    _debug('Layer 3: No ungrouped blocks remaining');
   }
 
   return groups;
@@ -332,69 +345,192 @@ export function groupBySimilarity(
 // ---------------------------------------------------------------------------
 
 function _groupByExactHash(blocks: CodeBlock[]): Map<string, CodeBlock[]> {
+  // Key on the whitespace-normalized source that computeContentHash digests:
+  // same buckets, without a SHA-256 per block.
   const hashGroups = new Map<string, CodeBlock[]>();
 
   for (const block of blocks) {
-    const hashVal = computeContentHash(block.sourceCode);
-    const existing = hashGroups.get(hashVal);
+    const key = normalizeContentWhitespace(block.sourceCode);
+    const existing = hashGroups.get(key);
     if (existing) {
       existing.push(block);
     } else {
-      hashGroups.set(hashVal, [block]);
+      hashGroups.set(key, [block]);
     }
   }
 
   return hashGroups;
 }
 
+// ---------------------------------------------------------------------------
+// Clustering (union-find)
+// ---------------------------------------------------------------------------
+
+/** Disjoint-set forest with path halving and union by rank. */
+class DisjointSet {
+  private readonly parent: Int32Array;
+  private readonly rank: Uint8Array;
+
+  constructor(size: number) {
+    this.parent = new Int32Array(size);
+    this.rank = new Uint8Array(size);
+    for (let i = 0; i < size; i++) this.parent[i] = i;
+  }
+
+  find(x: number): number {
+    while (this.parent[x] !== x) {
+      this.parent[x] = this.parent[this.parent[x]];
+      x = this.parent[x];
+    }
+    return x;
+  }
+
+  connected(a: number, b: number): boolean {
+    return this.find(a) === this.find(b);
+  }
+
+  union(a: number, b: number): void {
+    const rootA = this.find(a);
+    const rootB = this.find(b);
+    if (rootA === rootB) return;
+    if (this.rank[rootA] < this.rank[rootB]) {
+      this.parent[rootA] = rootB;
+    } else if (this.rank[rootA] > this.rank[rootB]) {
+      this.parent[rootB] = rootA;
+    } else {
+      this.parent[rootB] = rootA;
+      this.rank[rootA]++;
+    }
+  }
+}
+
+/** Similarity of a pair that caused a merge, keyed by one of its endpoints. */
+type MergeEdge = [index: number, similarity: number];
+
+/**
+ * Collect multi-member clusters in first-member order, scoring each by the
+ * mean similarity of the pairs that merged it.
+ */
+function _collectClusters(
+  blocks: CodeBlock[],
+  ds: DisjointSet,
+  edges: MergeEdge[]
+): Array<[CodeBlock[], number]> {
+  const members = new Map<number, CodeBlock[]>();
+  for (let i = 0; i < blocks.length; i++) {
+    const root = ds.find(i);
+    const existing = members.get(root);
+    if (existing) {
+      existing.push(blocks[i]);
+    } else {
+      members.set(root, [blocks[i]]);
+    }
+  }
+
+  const totals = new Map<number, [sum: number, count: number]>();
+  for (const [index, similarity] of edges) {
+    const root = ds.find(index);
+    const total = totals.get(root);
+    if (total) {
+      total[0] += similarity;
+      total[1]++;
+    } else {
+      totals.set(root, [similarity, 1]);
+    }
+  }
+
+  const clusters: Array<[CodeBlock[], number]> = [];
+  for (const [root, group] of members) {
+    if (group.length < 2) continue;
+    const total = totals.get(root);
+    const avgSimilarity = total ? total[0] / total[1] : SEMANTIC_WEIGHTS.BOTH_EMPTY_SIMILARITY;
+    clusters.push([group, avgSimilarity]);
+  }
+  return clusters;
+}
+
 // ---------------------------------------------------------------------------
 // Layer 2: Structural Similarity
 // ---------------------------------------------------------------------------
 
+/** Column view of the block fields read by the pairwise loops, built once per layer. */
+interface BlockColumns {
+  patternIds: string[];
+  categories: string[];
+  sources: string[];
+  lineCounts: number[];
+}
+
+function _toColumns(blocks: CodeBlock[]): BlockColumns {
+  return {
+    patternIds: blocks.map((b) => b.patternId),
+    categories: blocks.map((b) => b.category),
+    sources: blocks.map((b) => b.sourceCode),
+    lineCounts: blocks.map((b) => b.lineCount),
+  };
+}
+
 function _groupByStructuralSimilarity(
   blocks: CodeBlock[],
   threshold: number
 ): Array<[CodeBlock[], number]> {
   if (!blocks.length) return [];
 
-  const n = blocks.length;
-  const groups: Array<[CodeBlock[], number]> = [];
-  const used = new Set<number>();
+  // Ascending line counts let the inner loop stop at the first partner that
+  // is too large: every later one fails the line-ratio check as well.
+  const sorted = [...blocks].sort((a, b) => a.lineCount - b.lineCount);
+  const n = sorted.length;
+  const { patternIds, categories, sources, lineCounts } = _toColumns(sorted);
+  const ds = new DisjointSet(n);
+  const edges: MergeEdge[] = [];
+
+  // Normalized code, features and method chain are derived once per block,
+  // on first use, instead of once per pairing.
+  const profiles: Array<StructuralProfile | undefined> = new Array(n);
+  const profileAt = (k: number): StructuralProfile =>
+    (profiles[k] ??= buildStructuralProfile(sources[k]));
+
+  // Members of each cluster, keyed by root. A passing pair only merges its
+  // two clusters when every cross pair is compatible, so a chain of merges
+  // cannot build a cluster validateDuplicateGroup would reject as a whole.
+  const members: number[][] = Array.from({ length: n }, (_, k) => [k]);
+  const clustersCompatible = (rootA: number, rootB: number): boolean =>
+    members[rootA].every((a) => members[rootB].every((b) => areSemanticallyCompatible(sorted[a], sorted[b])));
 
   for (let i = 0; i < n; i++) {
-    if (used.has(i)) continue;
-
-    const group = [blocks[i]];
-    const similarities: number[] = [];
-
     for (let j = i + 1; j < n; j++) {
-      if (used.has(j)) continue;
+      if (lineCounts[i] < lineCounts[j] * SEMANTIC_WEIGHTS.LINE_RATIO_THRESHOLD) break;
 
-      if (!areSemanticallyCompatible(blocks[i], blocks[j])) continue;
+      // Already in the same cluster: no need to score the pair again
+      if (ds.connected(i, j)) continue;
 
-      const [similarity] = calculateStructuralSimilarity(
-        blocks[i].sourceCode,
-        blocks[j].sourceCode,
-        threshold
-      );
+      // Cheap column checks before the full compatibility test
+      if (patternIds[i] !== patternIds[j] || categories[i] !== categories[j]) continue;
+      if (!areSemanticallyCompatible(sorted[i], sorted[j])) continue;
+
+      const [similarity] = compareStructuralProfiles(profileAt(i), profileAt(j), threshold);
 
       if (similarity >= threshold) {
-        group.push(blocks[j]);
-        similarities.push(similarity);
-        used.add(j);
+        const rootI = ds.find(i);
+        const rootJ = ds.find(j);
+        if (!clustersCompatible(rootI, rootJ)) continue;
+
+        ds.union(i, j);
+        edges.push([i, similarity]);
+        const root = ds.find(i);
+        const absorbed = root === rootI ? rootJ : rootI;
+        for (const k of members[absorbed]) members[root].push(k);
+        members[absorbed] = [];
       }
     }
+  }
 
-    if (group.length >= 2) {
-      if (validateDuplicateGroup(group)) {
-        used.add(i);
-        const avgSimilarity = similarities.length > 0
-          ? similarities.reduce((a, b) => a + b, 0) / similarities.length
-          : SEMANTIC_WEIGHTS.BOTH_EMPTY_SIMILARITY;
-        groups.push([group, avgSimilarity]);
-      } else {
-        _stderr(`Warning: Group rejected by semantic validation: ${group.map((b) => b.blockId)}`);
-      }
+  const groups: Array<[CodeBlock[], number]> = [];
+  for (const [group, avgSimilarity] of _collectClusters(sorted, ds, edges)) {
+    if (validateDuplicateGroup(group)) {
+      groups.push([group, avgSimilarity]);
+    } else if (DEBUG) {
+      _debug(`Group rejected by semantic validation: ${group.map((b) => b.blockId)}`);
     }
   }
 
@@ -413,98 +549,269 @@ const SEMANTIC_SIM_WEIGHTS = {
   dataTypes: SEMANTIC_WEIGHTS.DATA_TYPES,
 } as const;
 
-function _calculateJaccardSimilarity(set1: Set<string>, set2: Set<string>): number {
-  if (set1.size === 0 && set2.size === 0) return SEMANTIC_WEIGHTS.BOTH_EMPTY_SIMILARITY;
-  if (set1.size === 0 || set2.size === 0) return SEMANTIC_WEIGHTS.EMPTY_SET_SIMILARITY;
-  let intersection = 0;
-  for (const item of set1) {
-    if (set2.has(item)) intersection++;
+// Most the fields not yet scored can add, in scoring order
+const SEMANTIC_SIM_REMAINING = {
+  afterOperations: SEMANTIC_SIM_WEIGHTS.domains + SEMANTIC_SIM_WEIGHTS.patterns + SEMANTIC_SIM_WEIGHTS.dataTypes,
+  afterDomains: SEMANTIC_SIM_WEIGHTS.patterns + SEMANTIC_SIM_WEIGHTS.dataTypes,
+  afterPatterns: SEMANTIC_SIM_WEIGHTS.dataTypes,
+} as const;
+
+// Slack on the pruning bound so float rounding never drops a pair that
+// the full weighted sum would accept
+const SEMANTIC_PRUNE_TOLERANCE = 1e-9;
+
+/**
+ * Assigns each distinct tag a bit position, so tag sets become word bitsets
+ * and Jaccard reduces to AND/OR plus popcount. Register every set before
+ * encoding any, so all bitsets share one width.
+ */
+class TagVocabulary {
+  private readonly positions = new Map<string, number>();
+  // Shared annotations hand in the same set objects; encode each once
+  private readonly encoded = new Map<ReadonlySet<string>, TagBits>();
+
+  register(tags: Iterable<string>): void {
+    for (const tag of tags) {
+      if (!this.positions.has(tag)) this.positions.set(tag, this.positions.size);
+    }
+  }
+
+  encode(tags: ReadonlySet<string>): TagBits {
+    const cached = this.encoded.get(tags);
+    if (cached) return cached;
+
+    const words = new Uint32Array(Math.ceil(this.positions.size / 32));
+    for (const tag of tags) {
+      const position = this.positions.get(tag)!;
+      words[position >>> 5] |= 1 << (position & 31);
+    }
+    const bits = { words, size: tags.size };
+    this.encoded.set(tags, bits);
+    return bits;
   }
-  const union = new Set([...set1, ...set2]).size;
-  return union > 0 ? intersection / union : 0.0;
 }
 
-function _calculateSemanticSimilarity(
-  ann1: SemanticAnnotation,
-  ann2: SemanticAnnotation
-): number {
-  const opSim = _calculateJaccardSimilarity(ann1.operations, ann2.operations);
-  const domainSim = _calculateJaccardSimilarity(ann1.domains, ann2.domains);
-  const patternSim = _calculateJaccardSimilarity(ann1.patterns, ann2.patterns);
-  const typeSim = _calculateJaccardSimilarity(ann1.dataTypes, ann2.dataTypes);
-
-  return (
-    opSim * SEMANTIC_SIM_WEIGHTS.operations +
-    domainSim * SEMANTIC_SIM_WEIGHTS.domains +
-    patternSim * SEMANTIC_SIM_WEIGHTS.patterns +
-    typeSim * SEMANTIC_SIM_WEIGHTS.dataTypes
-  );
+/** A tag set as a bitset, with its cardinality kept for the Jaccard denominator. */
+interface TagBits {
+  words: Uint32Array;
+  size: number;
+}
+
+/** Annotation tag sets as bitsets over a shared TagVocabulary. */
+interface AnnotationBits {
+  operations: TagBits;
+  domains: TagBits;
+  patterns: TagBits;
+  dataTypes: TagBits;
 }
 
-function _intentsCompatible(intent1: string, intent2: string): boolean {
-  if (intent1 === 'unknown' || intent2 === 'unknown') return false;
+/** Everything the Layer 3 pair loop reads, derived once per annotated block. */
+interface SemanticCandidate {
+  /** Position in the block list, used as the union-find id */
+  index: number;
+  category: string;
+  bits: AnnotationBits;
+  /** Operation tokens of the intent; undefined when the intent matches nothing */
+  intentOperations: ReadonlySet<string> | undefined;
+}
 
-  const opStr1 = intent1.split('|')[0] ?? '';
-  const opStr2 = intent2.split('|')[0] ?? '';
+function _prepareSemanticCandidates(
+  blocks: CodeBlock[],
+  annotations: Map<string, SemanticAnnotation>
+): SemanticCandidate[] {
+  const annotated: Array<[number, SemanticAnnotation]> = [];
+  const vocabulary = new TagVocabulary();
+  blocks.forEach((block, index) => {
+    const ann = annotations.get(block.blockId);
+    if (!ann) return;
+    annotated.push([index, ann]);
+    vocabulary.register(ann.operations);
+    vocabulary.register(ann.domains);
+    vocabulary.register(ann.patterns);
+    vocabulary.register(ann.dataTypes);
+  });
+
+  // Blocks with the same intent share one parsed token set
+  const intentOperations = new Map<string, ReadonlySet<string> | undefined>();
+  const parseIntent = (intent: string): ReadonlySet<string> | undefined => {
+    if (!intentOperations.has(intent)) intentOperations.set(intent, _parseIntentOperations(intent));
+    return intentOperations.get(intent);
+  };
 
-  const ops1 = new Set(opStr1.split('+').filter(Boolean));
-  const ops2 = new Set(opStr2.split('+').filter(Boolean));
+  return annotated.map(([index, ann]) => ({
+    index,
+    category: ann.category,
+    bits: {
+      operations: vocabulary.encode(ann.operations),
+      domains: vocabulary.encode(ann.domains),
+      patterns: vocabulary.encode(ann.patterns),
+      dataTypes: vocabulary.encode(ann.dataTypes),
+    },
+    intentOperations: parseIntent(ann.intent),
+  }));
+}
 
-  if (ops1.size === 0 || ops2.size === 0) return false;
+function _calculateJaccardSimilarity(bits1: TagBits, bits2: TagBits): number {
+  if (bits1.size === 0 && bits2.size === 0) return SEMANTIC_WEIGHTS.BOTH_EMPTY_SIMILARITY;
+  if (bits1.size === 0 || bits2.size === 0) return SEMANTIC_WEIGHTS.EMPTY_SET_SIMILARITY;
+  // Same encoded set on both sides (shared annotation)
+  if (bits1 === bits2) return 1.0;
 
-  for (const op of ops1) {
-    if (ops2.has(op)) return true;
+  const { words: words1 } = bits1;
+  const { words: words2 } = bits2;
+  let intersection = 0;
+  for (let w = 0; w < words1.length; w++) {
+    intersection += popcount32(words1[w] & words2[w]);
   }
-  return false;
+  // |A | B| = |A| + |B| - |A & B|, so the union needs no second pass
+  return intersection / (bits1.size + bits2.size - intersection);
 }
 
-function _groupBySemanticSimilarity(
-  blocks: CodeBlock[],
-  annotations: Map<string, SemanticAnnotation>,
+/**
+ * Weighted Jaccard over the four tag fields, or undefined as soon as the
+ * fields left to score cannot lift the total to `threshold`. Fields are
+ * added in descending-weight order, the same order as the full sum, so a
+ * returned score is bit-identical to it.
+ */
+function _semanticSimilarityAtLeast(
+  bits1: AnnotationBits,
+  bits2: AnnotationBits,
   threshold: number
-): Array<[CodeBlock[], number]> {
-  if (!blocks.length) return [];
+): number | undefined {
+  const floor = threshold - SEMANTIC_PRUNE_TOLERANCE;
 
-  const groups: Array<[CodeBlock[], number]> = [];
-  const used = new Set<number>();
+  let similarity =
+    _calculateJaccardSimilarity(bits1.operations, bits2.operations) * SEMANTIC_SIM_WEIGHTS.operations;
+  if (similarity + SEMANTIC_SIM_REMAINING.afterOperations < floor) return undefined;
 
-  for (let i = 0; i < blocks.length; i++) {
-    if (used.has(i)) continue;
+  similarity += _calculateJaccardSimilarity(bits1.domains, bits2.domains) * SEMANTIC_SIM_WEIGHTS.domains;
+  if (similarity + SEMANTIC_SIM_REMAINING.afterDomains < floor) return undefined;
 
-    const ann1 = annotations.get(blocks[i].blockId);
-    if (!ann1) continue;
+  similarity += _calculateJaccardSimilarity(bits1.patterns, bits2.patterns) * SEMANTIC_SIM_WEIGHTS.patterns;
+  if (similarity + SEMANTIC_SIM_REMAINING.afterPatterns < floor) return undefined;
 
-    const group = [blocks[i]];
-    const similarities: number[] = [];
+  similarity += _calculateJaccardSimilarity(bits1.dataTypes, bits2.dataTypes) * SEMANTIC_SIM_WEIGHTS.dataTypes;
+  return similarity >= threshold ? similarity : undefined;
+}
 
-    for (let j = i + 1; j < blocks.length; j++) {
-      if (used.has(j)) continue;
+/** Operation tokens of an intent string ('filter+map|on:user|...'). */
+function _parseIntentOperations(intent: string): ReadonlySet<string> | undefined {
+  if (intent === 'unknown') return undefined;
+  const opStr = intent.split('|')[0] ?? '';
+  const ops = new Set(opStr.split('+').filter(Boolean));
+  return ops.size > 0 ? ops : undefined;
+}
 
-      const ann2 = annotations.get(blocks[j].blockId);
-      if (!ann2) continue;
+/**
+ * Merge candidates whose category and tag sets are identical, and return
+ * one representative per signature for the pairwise pass. Members of a
+ * signature score the same against everyone, so comparing the first one
+ * decides for all of them. Candidates without intent operations can never
+ * merge and are dropped here.
+ */
+function _collapseDuplicateSignatures(
+  candidates: SemanticCandidate[],
+  ds: DisjointSet,
+  edges: MergeEdge[],
+  threshold: number
+): SemanticCandidate[] {
+  const representatives = new Map<string, SemanticCandidate>();
+  for (const candidate of candidates) {
+    if (!candidate.intentOperations) continue;
+    const { operations, domains, patterns, dataTypes } = candidate.bits;
+    const signature = [
+      candidate.category,
+      [...candidate.intentOperations].join('+'),
+      operations.words,
+      domains.words,
+      patterns.words,
+      dataTypes.words,
+    ].join('|');
+
+    const representative = representatives.get(signature);
+    if (!representative) {
+      representatives.set(signature, candidate);
+      continue;
+    }
+    const similarity = _semanticSimilarityAtLeast(representative.bits, candidate.bits, threshold);
+    if (similarity !== undefined) {
+      ds.union(representative.index, candidate.index);
+      edges.push([representative.index, similarity]);
+    }
+  }
+  return [...representatives.values()];
+}
 
-      if (ann1.category !== ann2.category) continue;
+/** category -> intent operation -> ascending candidate positions */
+function _buildIntentPostings(candidates: SemanticCandidate[]): Map<string, Map<string, number[]>> {
+  const postings = new Map<string, Map<string, number[]>>();
+  candidates.forEach((candidate, position) => {
+    if (!candidate.intentOperations) return;
+    let byOperation = postings.get(candidate.category);
+    if (!byOperation) {
+      byOperation = new Map();
+      postings.set(candidate.category, byOperation);
+    }
+    for (const op of candidate.intentOperations) {
+      const list = byOperation.get(op);
+      if (list) {
+        list.push(position);
+      } else {
+        byOperation.set(op, [position]);
+      }
+    }
+  });
+  return postings;
+}
 
-      const similarity = _calculateSemanticSimilarity(ann1, ann2);
-      if (similarity >= threshold) {
-        if (_intentsCompatible(ann1.intent, ann2.intent)) {
-          group.push(blocks[j]);
-          similarities.push(similarity);
-          used.add(j);
+function _groupBySemanticSimilarity(
+  blocks: CodeBlock[],
+  annotations: Map<string, SemanticAnnotation>,
+  threshold: number
+): Array<[CodeBlock[], number]> {
+  if (!blocks.length) return [];
+
+  const ds = new DisjointSet(blocks.length);
+  const edges: MergeEdge[] = [];
+  const candidates = _collapseDuplicateSignatures(
+    _prepareSemanticCandidates(blocks, annotations), ds, edges, threshold
+  );
+  const postings = _buildIntentPostings(candidates);
+
+  // Only blocks that share a category and an intent operation can merge, so
+  // partners come from the inverted index instead of every later candidate.
+  // Partners are visited in ascending order, the same order as a full scan.
+  const seenBy = new Int32Array(candidates.length).fill(-1);
+  const partners: number[] = [];
+
+  for (let i = 0; i < candidates.length; i++) {
+    const c1 = candidates[i];
+    const byOperation = postings.get(c1.category)!;
+
+    partners.length = 0;
+    for (const op of c1.intentOperations!) {
+      for (const j of byOperation.get(op)!) {
+        if (j > i && seenBy[j] !== i) {
+          seenBy[j] = i;
+          partners.push(j);
         }
       }
     }
+    partners.sort((x, y) => x - y);
 
-    if (group.length >= 2) {
-      used.add(i);
-      const avgSimilarity = similarities.length > 0
-        ? similarities.reduce((a, b) => a + b, 0) / similarities.length
-        : SEMANTIC_WEIGHTS.BOTH_EMPTY_SIMILARITY;
-      groups.push([group, avgSimilarity]);
+    for (const j of partners) {
+      const c2 = candidates[j];
+      if (ds.connected(c1.index, c2.index)) continue;
+
+      const similarity = _semanticSimilarityAtLeast(c1.bits, c2.bits, threshold);
+      if (similarity !== undefined) {
+        ds.union(c1.index, c2.index);
+        edges.push([c1.index, similarity]);
+      }
     }
   }
 
-  return groups;
+  return _collectClusters(blocks, ds, edges);
 }
 
 // ---------------------------------------------------------------------------
@@ -24,17 +24,10 @@ export function areSemanticallyCompatible(
   if (block1.category !== block2.category) return false;
 
   // Check 3: Tag compatibility
-  const tags1 = new Set(block1.tags);
-  const tags2 = new Set(block2.tags);
-
-  const func1 = extractFunctionTag(tags1);
-  const func2 = extractFunctionTag(tags2);
-
-  if (func1 && func2) {
-    // Same function in same file = already deduplicated, should not group
-    if (func1 === func2 && block1.location.filePath === block2.location.filePath) {
-      return false;
-    }
+  // Same function in same file = already deduplicated, should not group
+  if (block1.location.filePath === block2.location.filePath) {
+    const func1 = extractFunctionTag(block1.tags);
+    if (func1 && func1 === extractFunctionTag(block2.tags)) return false;
   }
 
   // Check 4: Complexity similarity (within 50% difference)
@@ -72,13 +65,11 @@ export function calculateTagOverlap(
 export function validateDuplicateGroup(blocks: CodeBlock[]): boolean {
   if (blocks.length < 2) return false;
 
-  // All blocks must have same pattern_id
-  const patternIds = new Set(blocks.map((b) => b.patternId));
-  if (patternIds.size > 1) return false;
-
-  // All blocks must have same category
-  const categories = new Set(blocks.map((b) => b.category));
-  if (categories.size > 1) return false;
+  // All blocks must share the first block's pattern_id and category
+  const { patternId, category } = blocks[0];
+  for (let i = 1; i < blocks.length; i++) {
+    if (blocks[i].patternId !== patternId || blocks[i].category !== category) return false;
+  }
 
   // Pairwise semantic compatibility
   for (let i = 0; i < blocks.length; i++) {
@@ -90,7 +81,7 @@ export function validateDuplicateGroup(blocks: CodeBlock[]): boolean {
   return true;
 }
 
-function extractFunctionTag(tags: Set<string>): string | undefined {
+function extractFunctionTag(tags: Iterable<string>): string | undefined {
   for (const tag of tags) {
     if (tag.startsWith(BLOCK_EXTRACTION.FUNCTION_TAG_PREFIX)) {
       return tag.slice(BLOCK_EXTRACTION.FUNCTION_TAG_PREFIX.length);
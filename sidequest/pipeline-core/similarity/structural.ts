@@ -1,4 +1,4 @@
-import { createHash } from 'node:crypto';
+import { hash } from 'node:crypto';
 
 export const STRUCTURAL_DEFAULTS = {
   CHAIN_MISSING_SIMILARITY: 0.5,
@@ -13,6 +13,8 @@ export const STRUCTURAL_DEFAULTS = {
 
 export const EXTRACTION_DEFAULTS = {
   METHOD_CHAIN_MAX_GAP: 100,
+  /** Per-function cap on memoized results keyed by source string */
+  MEMO_MAX_ENTRIES: 4096,
 } as const;
 
 const SEMANTIC_METHODS = new Set([
@@ -29,13 +31,136 @@ const SEMANTIC_OBJECTS = new Set([
   'JSON','Date','Promise',
 ]);
 
+// ---------------------------------------------------------------------------
+// Precompiled patterns
+// ---------------------------------------------------------------------------
+
+const STATUS_CALL_PATTERN = /\.status\((\d{3})\)/g;
+const RESPONSE_STATUS_PATTERN = /(?:res|response)\.status\((\d{3})\)/g;
+// Longest alternative first so `!==`/`===` are consumed as whole tokens
+// before `!=`/`==`/`!` can match inside them.
+const LOGICAL_OPERATOR_PATTERN = /!==|===|!=|==|(?<![!=])!(?!=)/g;
+const METHOD_CHAIN_PATTERN = /\.([a-zA-Z_][a-zA-Z0-9_]*)\s*\(/g;
+
+const FEATURE_OPERATOR_PATTERNS: ReadonlyArray<[RegExp, string]> = [
+  [/!==/, '!=='],
+  [/===/, '==='],
+  [/!=/, '!='],
+  [/==/, '=='],
+  [/!\s*[^=]/, '!'],
+  [/&&/, '&&'],
+  [/\|\|/, '||'],
+];
+
+const FEATURE_METHOD_PATTERNS: ReadonlyArray<[string, RegExp]> = [
+  ['Math.max', /Math\.max\s*\(/],
+  ['Math.min', /Math\.min\s*\(/],
+  ['Math.floor', /Math\.floor\s*\(/],
+  ['Math.ceil', /Math\.ceil\s*\(/],
+  ['Math.round', /Math\.round\s*\(/],
+  ['console.log', /console\.log\s*\(/],
+  ['console.error', /console\.error\s*\(/],
+  ['console.warn', /console\.warn\s*\(/],
+  ['.reverse', /\.reverse\s*\(/],
+  ['.toUpperCase', /\.toUpperCase\s*\(/],
+  ['.toLowerCase', /\.toLowerCase\s*\(/],
+];
+
+/**
+ * Single-pass tokenizer for normalizeCode. Capture groups, in order:
+ * 1 comment, 2 single-quoted, 3 double-quoted, 4 template literal,
+ * 5 word, 6 whitespace, 7 punctuation, 8 operator; anything else is one char.
+ */
+const NORMALIZE_TOKEN_PATTERN = new RegExp(
+  [
+    String.raw`(\/\/[^\n\r\u2028\u2029]*|\/\*[\s\S]*?\*\/)`,
+    String.raw`('[^']*')`,
+    String.raw`("[^"]*")`,
+    String.raw`(\`[^\`]*\`)`,
+    String.raw`(\w+)`,
+    String.raw`(\s+)`,
+    String.raw`([(){}[\];,.])`,
+    String.raw`(=>|===?|!==?|[+\-*/%<>=&|])`,
+    String.raw`[\s\S]`,
+  ].join('|'),
+  'g'
+);
+const DIGITS_PATTERN = /^\d+$/;
+const IDENTIFIER_START_PATTERN = /^[A-Za-z_]/;
+const LOWER_IDENTIFIER_PATTERN = /^[a-z]/;
+const UPPER_CONSTANT_PATTERN = /^[A-Z][A-Z0-9_]*$/;
+
+// Token kinds that decide the separator emitted between two tokens
+const TOKEN_KIND = { TEXT: 0, PUNCT: 1, OPERATOR: 2 } as const;
+type TokenKind = typeof TOKEN_KIND[keyof typeof TOKEN_KIND];
+
+// Identifiers kept verbatim by normalizeCode: literal placeholders plus semantic names
+const PRESERVED_IDENTIFIERS = new Set<string>([
+  'STR',
+  'NUM',
+  ...SEMANTIC_OBJECTS,
+  ...SEMANTIC_METHODS,
+]);
+
+function normalizeIdentifier(word: string): string {
+  if (PRESERVED_IDENTIFIERS.has(word)) return word;
+  if (LOWER_IDENTIFIER_PATTERN.test(word)) return 'var';
+  if (UPPER_CONSTANT_PATTERN.test(word)) return 'CONST';
+  return word;
+}
+
+/**
+ * Features are memoized per source string and shared between callers,
+ * so they are exposed read-only.
+ */
 export interface SemanticFeatures {
-  httpStatusCodes: Set<number>;
-  logicalOperators: Set<string>;
-  semanticMethods: Set<string>;
+  httpStatusCodes: ReadonlySet<number>;
+  logicalOperators: ReadonlySet<string>;
+  semanticMethods: ReadonlySet<string>;
+}
+
+/** Bounded least-recently-used memo keyed by source string. */
+class SourceMemo<T> {
+  private readonly entries = new Map<string, T>();
+
+  get(source: string, compute: (source: string) => T): T {
+    const cached = this.entries.get(source);
+    if (cached !== undefined) {
+      // Re-insert to mark as most recently used
+      this.entries.delete(source);
+      this.entries.set(source, cached);
+      return cached;
+    }
+    const value = compute(source);
+    if (this.entries.size >= EXTRACTION_DEFAULTS.MEMO_MAX_ENTRIES) {
+      const oldest = this.entries.keys().next().value;
+      if (oldest !== undefined) this.entries.delete(oldest);
+    }
+    this.entries.set(source, value);
+    return value;
+  }
 }
 
-function setsEqual<T>(a: Set<T>, b: Set<T>): boolean {
+const featuresMemo = new SourceMemo<SemanticFeatures>();
+const normalizedMemo = new SourceMemo<string>();
+const astHashMemo = new SourceMemo<string>();
+const methodChainMemo = new SourceMemo<readonly string[]>();
+
+/**
+ * Everything calculateStructuralSimilarity derives from one side of a pair.
+ * Build once per block and reuse across all of its pairings.
+ */
+export interface StructuralProfile {
+  readonly sourceCode: string;
+  readonly normalized: string;
+  readonly features: SemanticFeatures;
+  readonly methodChain: readonly string[];
+}
+
+const profileMemo = new SourceMemo<StructuralProfile>();
+
+function setsEqual<T>(a: ReadonlySet<T>, b: ReadonlySet<T>): boolean {
+  if (a === b) return true;
   if (a.size !== b.size) return false;
   for (const item of a) {
     if (!b.has(item)) return false;
@@ -44,146 +169,180 @@ function setsEqual<T>(a: Set<T>, b: Set<T>): boolean {
 }
 
 export function extractSemanticFeatures(sourceCode: string): SemanticFeatures {
-  const features: SemanticFeatures = {
-    httpStatusCodes: new Set(),
-    logicalOperators: new Set(),
-    semanticMethods: new Set(),
-  };
-  if (!sourceCode) return features;
+  if (!sourceCode) {
+    return { httpStatusCodes: new Set(), logicalOperators: new Set(), semanticMethods: new Set() };
+  }
+  return featuresMemo.get(sourceCode, computeSemanticFeatures);
+}
 
-  const statusPattern = /\.status\((\d{3})\)/g;
-  let match: RegExpExecArray | null;
-  while ((match = statusPattern.exec(sourceCode)) !== null) {
-    features.httpStatusCodes.add(parseInt(match[1], 10));
+function computeSemanticFeatures(sourceCode: string): SemanticFeatures {
+  const httpStatusCodes = new Set<number>();
+  const logicalOperators = new Set<string>();
+  const semanticMethods = new Set<string>();
+
+  for (const match of sourceCode.matchAll(STATUS_CALL_PATTERN)) {
+    httpStatusCodes.add(parseInt(match[1], 10));
   }
 
-  const operatorPatterns: [RegExp, string][] = [
-    [/!==/, '!=='],
-    [/===/, '==='],
-    [/!=/, '!='],
-    [/==/, '=='],
-    [/!\s*[^=]/, '!'],
-    [/&&/, '&&'],
-    [/\|\|/, '||'],
-  ];
-  for (const [pattern, op] of operatorPatterns) {
+  for (const [pattern, op] of FEATURE_OPERATOR_PATTERNS) {
     if (pattern.test(sourceCode)) {
-      features.logicalOperators.add(op);
+      logicalOperators.add(op);
     }
   }
 
-  const semanticPatterns: [string, RegExp][] = [
-    ['Math.max', /Math\.max\s*\(/],
-    ['Math.min', /Math\.min\s*\(/],
-    ['Math.floor', /Math\.floor\s*\(/],
-    ['Math.ceil', /Math\.ceil\s*\(/],
-    ['Math.round', /Math\.round\s*\(/],
-    ['console.log', /console\.log\s*\(/],
-    ['console.error', /console\.error\s*\(/],
-    ['console.warn', /console\.warn\s*\(/],
-    ['.reverse', /\.reverse\s*\(/],
-    ['.toUpperCase', /\.toUpperCase\s*\(/],
-    ['.toLowerCase', /\.toLowerCase\s*\(/],
-  ];
-  for (const [methodName, pattern] of semanticPatterns) {
+  for (const [methodName, pattern] of FEATURE_METHOD_PATTERNS) {
     if (pattern.test(sourceCode)) {
-      features.semanticMethods.add(methodName);
+      semanticMethods.add(methodName);
     }
   }
 
-  return features;
+  return { httpStatusCodes, logicalOperators, semanticMethods };
 }
 
 export function normalizeCode(sourceCode: string): string {
   if (!sourceCode) return '';
+  return normalizedMemo.get(sourceCode, computeNormalizedCode);
+}
 
-  let normalized = sourceCode.replace(/\/\/.*?$/gm, '');
-  normalized = normalized.replace(/\/\*.*?\*\//gs, '');
-  normalized = normalized.replace(/\s+/g, ' ');
-  normalized = normalized.replace(/'[^']*'/g, "'STR'");
-  normalized = normalized.replace(/"[^"]*"/g, '"STR"');
-  normalized = normalized.replace(/`[^`]*`/g, '`STR`');
-  normalized = normalized.replace(/\b\d+\b/g, 'NUM');
-
-  // Protect STR/NUM placeholders and semantic identifiers before normalization
-  normalized = normalized.replace(/\bSTR\b/g, '__PRESERVE_LITERAL_STR__');
-  normalized = normalized.replace(/\bNUM\b/g, '__PRESERVE_LITERAL_NUM__');
-
-  for (const obj of SEMANTIC_OBJECTS) {
-    normalized = normalized.replace(
-      new RegExp(`\\b${obj}\\b`, 'g'),
-      `__PRESERVE_OBJ_${obj.toUpperCase()}__`
-    );
-  }
-  for (const method of SEMANTIC_METHODS) {
-    normalized = normalized.replace(
-      new RegExp(`\\b${method}\\b`, 'g'),
-      `__PRESERVE_${method.toUpperCase()}__`
-    );
-  }
+function normalizeWord(word: string): string {
+  if (DIGITS_PATTERN.test(word)) return 'NUM';
+  if (IDENTIFIER_START_PATTERN.test(word)) return normalizeIdentifier(word);
+  return word;
+}
 
-  normalized = normalized.replace(/\b[a-z][a-zA-Z0-9_]*\b/g, 'var');
-  normalized = normalized.replace(/\b[A-Z][A-Z0-9_]*\b/g, 'CONST');
+/**
+ * Tokenize once and emit normalized tokens: comments dropped, literals
+ * replaced by STR/NUM, identifiers normalized, no space around punctuation,
+ * single spaces around operators and wherever the source had whitespace.
+ */
+function computeNormalizedCode(sourceCode: string): string {
+  const parts: string[] = [];
+  let lastKind: TokenKind = TOKEN_KIND.TEXT;
+  let pendingSpace = false;
+
+  for (const m of sourceCode.matchAll(NORMALIZE_TOKEN_PATTERN)) {
+    if (m[1] !== undefined) continue;
+    if (m[6] !== undefined) {
+      pendingSpace = true;
+      continue;
+    }
 
-  for (const obj of SEMANTIC_OBJECTS) {
-    normalized = normalized.split(`__PRESERVE_OBJ_${obj.toUpperCase()}__`).join(obj);
-  }
-  for (const method of SEMANTIC_METHODS) {
-    normalized = normalized.split(`__PRESERVE_${method.toUpperCase()}__`).join(method);
+    let text: string;
+    let kind: TokenKind = TOKEN_KIND.TEXT;
+    if (m[2] !== undefined) text = "'STR'";
+    else if (m[3] !== undefined) text = '"STR"';
+    else if (m[4] !== undefined) text = '`STR`';
+    else if (m[5] !== undefined) text = normalizeWord(m[5]);
+    else if (m[7] !== undefined) {
+      text = m[7];
+      kind = TOKEN_KIND.PUNCT;
+    } else if (m[8] !== undefined) {
+      text = m[8];
+      kind = TOKEN_KIND.OPERATOR;
+    } else text = m[0];
+
+    if (parts.length > 0) {
+      if (kind === TOKEN_KIND.OPERATOR || lastKind === TOKEN_KIND.OPERATOR) {
+        parts.push(' ');
+      } else if (kind !== TOKEN_KIND.PUNCT && lastKind !== TOKEN_KIND.PUNCT && pendingSpace) {
+        parts.push(' ');
+      }
+    }
+    parts.push(text);
+    lastKind = kind;
+    pendingSpace = false;
   }
-  normalized = normalized.split('__PRESERVE_LITERAL_STR__').join('STR');
-  normalized = normalized.split('__PRESERVE_LITERAL_NUM__').join('NUM');
 
-  normalized = normalized.replace(/\s*([(){}[\];,.])\s*/g, '$1');
-  normalized = normalized.replace(/\s*(=>|===?|!==?|[+\-*/%<>=&|])\s*/g, ' $1 ');
-  normalized = normalized.replace(/\s+/g, ' ');
-
-  return normalized.trim();
+  return parts.join('');
 }
 
+/**
+ * SHA-256 hex of the normalized code. The digest is persisted as a block's
+ * structural_hash, so the algorithm stays fixed; the one-shot crypto.hash()
+ * skips the streaming Hash object.
+ */
 export function calculateAstHash(sourceCode: string): string {
-  const normalized = normalizeCode(sourceCode);
-  return createHash('sha256').update(normalized).digest('hex');
+  return astHashMemo.get(sourceCode, (source) => hash('sha256', normalizeCode(source)));
 }
 
-export function calculateLevenshteinSimilarity(str1: string, str2: string): number {
-  if (!str1 || !str2) return 0.0;
-  if (str1 === str2) return 1.0;
+const BITS_PER_WORD = 32;
+const WORD_MASK = 0xffffffff;
 
-  // SequenceMatcher.ratio() = 2 * M / T where M = matching chars, T = total chars
-  // Use dynamic programming to find LCS-based matching blocks length
-  const len1 = str1.length;
-  const len2 = str2.length;
-
-  // Build DP table for LCS
-  const dp: number[] = new Array(len2 + 1).fill(0);
-
-  for (let i = 1; i <= len1; i++) {
-    let prev = 0;
-    for (let j = 1; j <= len2; j++) {
-      const temp = dp[j];
-      if (str1[i - 1] === str2[j - 1]) {
-        dp[j] = prev + 1;
-      } else {
-        dp[j] = Math.max(dp[j], dp[j - 1]);
-      }
-      prev = temp;
+/** Number of set bits in a 32-bit word. */
+export function popcount32(x: number): number {
+  x -= (x >>> 1) & 0x55555555;
+  x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+  x = (x + (x >>> 4)) & 0x0f0f0f0f;
+  return Math.imul(x, 0x01010101) >>> 24;
+}
+
+/**
+ * Length of the longest common subsequence, bit-parallel (Allison-Dix /
+ * Hyyro). Each bit of V tracks one position of `pattern`, so a character of
+ * `text` advances 32 DP cells per word operation: O(n * m / 32) instead of
+ * O(n * m). The LCS length is the number of cleared bits in V.
+ */
+function lcsLength(pattern: string, text: string): number {
+  const m = pattern.length;
+  const words = Math.ceil(m / BITS_PER_WORD);
+
+  // Match masks: bit j of masks.get(c) is set where pattern[j] === c
+  const masks = new Map<number, Uint32Array>();
+  for (let j = 0; j < m; j++) {
+    const code = pattern.charCodeAt(j);
+    let mask = masks.get(code);
+    if (mask === undefined) {
+      mask = new Uint32Array(words);
+      masks.set(code, mask);
+    }
+    mask[j >>> 5] |= 1 << (j & 31);
+  }
+
+  const v = new Uint32Array(words).fill(WORD_MASK);
+  for (let i = 0; i < text.length; i++) {
+    const mask = masks.get(text.charCodeAt(i));
+    // A character absent from the pattern leaves V unchanged
+    if (mask === undefined) continue;
+
+    // V' = (V + (V & M)) | (V & ~M), with the addition carried across words
+    let carry = 0;
+    for (let w = 0; w < words; w++) {
+      const vw = v[w];
+      const u = vw & mask[w];
+      const sum = vw + (u >>> 0) + carry;
+      carry = sum > WORD_MASK ? 1 : 0;
+      v[w] = sum | (vw & ~mask[w]);
     }
   }
 
-  const lcs = dp[len2];
-  return (2 * lcs) / (len1 + len2);
+  let lcs = 0;
+  for (let w = 0; w < words; w++) {
+    const bits = Math.min(BITS_PER_WORD, m - w * BITS_PER_WORD);
+    const valid = bits === BITS_PER_WORD ? WORD_MASK : (1 << bits) - 1;
+    lcs += popcount32(~v[w] & valid);
+  }
+  return lcs;
+}
+
+export function calculateLevenshteinSimilarity(str1: string, str2: string): number {
+  if (!str1 || !str2) return 0.0;
+  if (str1 === str2) return 1.0;
+
+  // SequenceMatcher.ratio() = 2 * M / T where M = matching chars, T = total chars,
+  // with M taken as the LCS length. LCS is symmetric, so the shorter string
+  // is the bit-vector pattern (fewer words per step).
+  const [text, pattern] = str1.length >= str2.length ? [str1, str2] : [str2, str1];
+  const lcs = lcsLength(pattern, text);
+  return (2 * lcs) / (str1.length + str2.length);
 }
 
 export function extractLogicalOperators(sourceCode: string): Set<string> {
   const operators = new Set<string>();
   if (!sourceCode) return operators;
 
-  if (sourceCode.includes('!==')) operators.add('!==');
-  if (sourceCode.includes('===')) operators.add('===');
-  if (sourceCode.includes('!=') && !sourceCode.includes('!==')) operators.add('!=');
-  if (sourceCode.includes('==') && !sourceCode.includes('===')) operators.add('==');
-  if (/(?<![!=])!(?![=])/.test(sourceCode)) operators.add('!');
+  for (const match of sourceCode.matchAll(LOGICAL_OPERATOR_PATTERN)) {
+    operators.add(match[0]);
+  }
 
   return operators;
 }
@@ -192,9 +351,7 @@ export function extractHttpStatusCodes(sourceCode: string): Set<number> {
   const statusCodes = new Set<number>();
   if (!sourceCode) return statusCodes;
 
-  const pattern = /(?:res|response)\.status\((\d{3})\)/g;
-  let match: RegExpExecArray | null;
-  while ((match = pattern.exec(sourceCode)) !== null) {
+  for (const match of sourceCode.matchAll(RESPONSE_STATUS_PATTERN)) {
     statusCodes.add(parseInt(match[1], 10));
   }
 
@@ -217,59 +374,52 @@ export function extractSemanticMethods(sourceCode: string): Set<string> {
 export function extractMethodChain(sourceCode: string): string[] {
   if (!sourceCode) return [];
 
-  const pattern = /\.([a-zA-Z_][a-zA-Z0-9_]*)\s*\(/g;
-  const matches: Array<{ name: string; index: number }> = [];
-
-  let match: RegExpExecArray | null;
-  while ((match = pattern.exec(sourceCode)) !== null) {
-    matches.push({ name: match[1], index: match.index });
-  }
-
-  if (matches.length === 0) return [];
-
-  const chains: string[][] = [];
+  // Single streaming pass: a call more than METHOD_CHAIN_MAX_GAP characters
+  // after the previous one starts a new chain. Only the longest chain seen so
+  // far is kept (first one wins on ties); single calls are not chains.
+  let longest: string[] = [];
   let currentChain: string[] = [];
   let lastPos = -1;
 
-  for (let i = 0; i < matches.length; i++) {
-    const { name, index } = matches[i];
-    if (currentChain.length > 0 && index - lastPos > EXTRACTION_DEFAULTS.METHOD_CHAIN_MAX_GAP) {
-      if (currentChain.length > 1) chains.push(currentChain);
-      currentChain = [name];
-    } else {
-      currentChain.push(name);
-    }
-    if (i < matches.length - 1) {
-      lastPos = matches[i + 1].index;
-    } else {
-      lastPos = sourceCode.length;
+  for (const match of sourceCode.matchAll(METHOD_CHAIN_PATTERN)) {
+    if (currentChain.length > 0 && match.index - lastPos > EXTRACTION_DEFAULTS.METHOD_CHAIN_MAX_GAP) {
+      if (currentChain.length > 1 && currentChain.length > longest.length) longest = currentChain;
+      currentChain = [];
     }
+    currentChain.push(match[1]);
+    lastPos = match.index;
   }
 
-  if (currentChain.length > 1) chains.push(currentChain);
-
-  if (chains.length === 0) return [];
-  return chains.reduce((longest, chain) => chain.length > longest.length ? chain : longest, chains[0]);
+  if (currentChain.length > 1 && currentChain.length > longest.length) longest = currentChain;
+  return longest;
 }
 
 export function compareMethodChains(code1: string, code2: string): number {
-  const chain1 = extractMethodChain(code1);
-  const chain2 = extractMethodChain(code2);
+  return compareChains(extractMethodChain(code1), extractMethodChain(code2));
+}
 
+/** Number of leading positions where both chains name the same method. */
+function commonPrefixLength(chain1: readonly string[], chain2: readonly string[]): number {
+  const limit = Math.min(chain1.length, chain2.length);
+  let k = 0;
+  while (k < limit && chain1[k] === chain2[k]) k++;
+  return k;
+}
+
+function compareChains(chain1: readonly string[], chain2: readonly string[]): number {
   if (chain1.length === 0 && chain2.length === 0) return 1.0;
   if (chain1.length === 0 || chain2.length === 0) return STRUCTURAL_DEFAULTS.CHAIN_MISSING_SIMILARITY;
-  if (chain1.join(',') === chain2.join(',')) return 1.0;
 
   if (chain1.length !== chain2.length) {
-    const shorter = chain1.length < chain2.length ? chain1 : chain2;
-    const longer = chain1.length > chain2.length ? chain1 : chain2;
-    if (longer.slice(0, shorter.length).join(',') === shorter.join(',')) {
-      return shorter.length / longer.length;
-    }
-    return 0.0;
+    const shorter = Math.min(chain1.length, chain2.length);
+    const longer = Math.max(chain1.length, chain2.length);
+    return commonPrefixLength(chain1, chain2) === shorter ? shorter / longer : 0.0;
   }
 
-  const overlap = chain1.reduce((count, m, i) => count + (m === chain2[i] ? 1 : 0), 0);
+  let overlap = 0;
+  for (let k = 0; k < chain1.length; k++) {
+    if (chain1[k] === chain2[k]) overlap++;
+  }
   return overlap / chain1.length;
 }
 
@@ -277,6 +427,9 @@ export function calculateSemanticPenalty(
   features1: SemanticFeatures,
   features2: SemanticFeatures
 ): number {
+  // Memoized features are shared per source, so identical inputs compare by reference.
+  if (features1 === features2) return 1.0;
+
   let penalty = 1.0;
 
   if (features1.httpStatusCodes.size > 0 && features2.httpStatusCodes.size > 0) {
@@ -300,28 +453,66 @@ export function calculateSemanticPenalty(
   return penalty;
 }
 
+/** Memoized per source string, like the derivations it bundles. */
+export function buildStructuralProfile(sourceCode: string): StructuralProfile {
+  if (!sourceCode) return computeStructuralProfile(sourceCode);
+  return profileMemo.get(sourceCode, computeStructuralProfile);
+}
+
+function computeStructuralProfile(sourceCode: string): StructuralProfile {
+  return {
+    sourceCode,
+    normalized: normalizeCode(sourceCode),
+    features: extractSemanticFeatures(sourceCode),
+    methodChain: sourceCode ? methodChainMemo.get(sourceCode, extractMethodChain) : [],
+  };
+}
+
 export function calculateStructuralSimilarity(
   code1: string,
   code2: string,
   threshold: number = STRUCTURAL_DEFAULTS.DEFAULT_SIMILARITY_THRESHOLD
 ): [number, string] {
   if (!code1 || !code2) return [0.0, 'different'];
+  if (code1 === code2) return [1.0, 'exact'];
+
+  return compareStructuralProfiles(buildStructuralProfile(code1), buildStructuralProfile(code2), threshold);
+}
+
+/**
+ * Same scoring as calculateStructuralSimilarity, over precomputed profiles,
+ * so pairwise callers normalize and extract features once per block.
+ */
+export function compareStructuralProfiles(
+  profile1: StructuralProfile,
+  profile2: StructuralProfile,
+  threshold: number = STRUCTURAL_DEFAULTS.DEFAULT_SIMILARITY_THRESHOLD
+): [number, string] {
+  if (!profile1.sourceCode || !profile2.sourceCode) return [0.0, 'different'];
+  if (profile1.sourceCode === profile2.sourceCode) return [1.0, 'exact'];
 
-  const hash1 = createHash('sha256').update(code1).digest('hex');
-  const hash2 = createHash('sha256').update(code2).digest('hex');
-  if (hash1 === hash2) return [1.0, 'exact'];
+  const { normalized: normalized1 } = profile1;
+  const { normalized: normalized2 } = profile2;
 
-  const features1 = extractSemanticFeatures(code1);
-  const features2 = extractSemanticFeatures(code2);
-  const normalized1 = normalizeCode(code1);
-  const normalized2 = normalizeCode(code2);
+  const penalty = calculateSemanticPenalty(profile1.features, profile2.features);
 
   let baseSimilarity: number;
   if (normalized1 === normalized2) {
     baseSimilarity = STRUCTURAL_DEFAULTS.NORMALIZED_IDENTICAL;
   } else {
+    // The LCS ratio is at most 1 - |n - m| / (n + m); if even that (plus the
+    // best possible chain blend) cannot reach the threshold, skip the O(n*m)
+    // kernel and report the bound as the score.
+    const lengthBound =
+      1 - Math.abs(normalized1.length - normalized2.length) / (normalized1.length + normalized2.length);
+    const upperBound = penalty * Math.max(
+      lengthBound,
+      lengthBound * STRUCTURAL_DEFAULTS.CHAIN_LEVENSHTEIN_WEIGHT + STRUCTURAL_DEFAULTS.CHAIN_STRUCTURE_WEIGHT
+    );
+    if (upperBound < threshold) return [upperBound, 'different'];
+
     baseSimilarity = calculateLevenshteinSimilarity(normalized1, normalized2);
-    const chainSimilarity = compareMethodChains(code1, code2);
+    const chainSimilarity = compareChains(profile1.methodChain, profile2.methodChain);
     if (chainSimilarity < 1.0) {
       baseSimilarity =
         baseSimilarity * STRUCTURAL_DEFAULTS.CHAIN_LEVENSHTEIN_WEIGHT +
@@ -329,7 +520,6 @@ export function calculateStructuralSimilarity(
     }
   }
 
-  const penalty = calculateSemanticPenalty(features1, features2);
   const finalSimilarity = baseSimilarity * penalty;
 
   if (finalSimilarity >= threshold) {
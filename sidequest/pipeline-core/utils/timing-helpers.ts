@@ -6,9 +6,11 @@
  * @module lib/utils/timing-helpers
  */
 
-import { TIME_MS } from '../../core/units.ts';
+import { NANOSECONDS_PER_SECOND, TIME_MS } from '../../core/units.ts';
 import { formatDuration } from '../../utils/time-helpers.ts';
 
+const NANOSECONDS_PER_MS = NANOSECONDS_PER_SECOND / TIME_MS.SECOND;
+
 interface Timer {
   /** Returns elapsed time in seconds */
   elapsed: () => number;
@@ -21,15 +23,21 @@ interface Timer {
 /**
  * Create the timer.
  *
+ * Reads the monotonic clock as integer nanoseconds and converts to
+ * milliseconds/seconds only when a value is requested, so wall-clock
+ * adjustments cannot skew a measurement.
+ *
  * @returns {Timer} The created timer
  */
 export function createTimer(): Timer {
-  const startTime = Date.now();
+  const startNs = process.hrtime.bigint();
+  const elapsedMs = () => Number(process.hrtime.bigint() - startNs) / NANOSECONDS_PER_MS;
 
   return {
-    elapsed: () => (Date.now() - startTime) / TIME_MS.SECOND,
-    elapsedMs: () => Date.now() - startTime,
-    elapsedFormatted: () => formatDuration((Date.now() - startTime) / TIME_MS.SECOND)
+    elapsed: () => elapsedMs() / TIME_MS.SECOND,
+    elapsedMs,
+    // Whole milliseconds keep the display as short as before
+    elapsedFormatted: () => formatDuration(Math.round(elapsedMs()) / TIME_MS.SECOND)
   };
 }
 
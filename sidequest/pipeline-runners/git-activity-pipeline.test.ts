@@ -57,6 +57,19 @@ test('parseGitActivityCliArgs rejects unknown flags', () => {
   assert.ok(parsed.errors.includes('Unknown flag: --mothly'));
 });
 
+test('parseGitActivityCliArgs accepts --profile with an immediate run', () => {
+  const parsed = parseGitActivityCliArgs(['--run', '--profile', '/tmp/report.cpuprofile'], false);
+
+  assert.equal(parsed.profilePath, '/tmp/report.cpuprofile');
+  assert.deepEqual(parsed.errors, []);
+});
+
+test('parseGitActivityCliArgs rejects --profile without --run-now', () => {
+  const parsed = parseGitActivityCliArgs(['--profile', '/tmp/report.cpuprofile'], false);
+
+  assert.ok(parsed.errors.includes('--profile requires --run-now'));
+});
+
 test('parseGitActivityCliArgs rejects positional arguments', () => {
   const parsed = parseGitActivityCliArgs(['--weekly', 'extra-arg'], false);
 
@@ -1,4 +1,6 @@
 #!/usr/bin/env -S node --strip-types
+import fs from 'fs/promises';
+import { Session } from 'node:inspector/promises';
 import { GitActivityWorker } from '../workers/git-activity-worker.ts';
 import { config } from '../core/config.ts';
 import { CONCURRENCY, GIT_ACTIVITY, NUMBER_BASE, PROCESS } from '../core/constants.ts';
@@ -33,6 +35,8 @@ function isDefaultReportType(reportType: string | undefined): reportType is Defa
 interface ParsedCliArgs {
   options: ReportOptions;
   runNow: boolean;
+  /** Where to write a V8 CPU profile of an immediate run */
+  profilePath?: string;
   errors: string[];
 }
 
@@ -221,6 +225,7 @@ export function parseGitActivityCliArgs(args: string[], runOnStartup: boolean):
   const options: ReportOptions = {};
   const errors: string[] = [];
   let runNow = runOnStartup;
+  let profilePath: string | undefined;
 
   for (let i = 0; i < args.length; i++) {
     const arg = args[i];
@@ -256,6 +261,13 @@ export function parseGitActivityCliArgs(args: string[], runOnStartup: boolean):
         options.days = parsedDays;
       }
       i++;
+    } else if (arg === '--profile') {
+      if (!args[i + 1] || args[i + 1].startsWith('--')) {
+        errors.push('--profile requires an output file path');
+        continue;
+      }
+      profilePath = args[i + 1];
+      i++;
     } else if (arg.startsWith('--')) {
       errors.push(`Unknown flag: ${arg}`);
     } else {
@@ -263,6 +275,9 @@ export function parseGitActivityCliArgs(args: string[], runOnStartup: boolean):
     }
   }
 
+  if (profilePath && !runNow) {
+    errors.push('--profile requires --run-now');
+  }
   if (options.untilDate && !options.sinceDate) {
     errors.push('--end-date requires --start-date');
   }
@@ -273,7 +288,29 @@ export function parseGitActivityCliArgs(args: string[], runOnStartup: boolean):
     errors.push(`--end-date must match YYYY-MM-DD (received: ${options.untilDate})`);
   }
 
-  return { options, runNow, errors };
+  return { options, runNow, profilePath, errors };
+}
+
+/**
+ * Run `fn` under the V8 CPU profiler and write the profile to `profilePath`
+ * (open it in Chrome DevTools or speedscope). Time spent waiting on git
+ * subprocesses shows up as idle, which separates I/O from compute.
+ */
+export async function withCpuProfile<T>(profilePath: string | undefined, fn: () => Promise<T>): Promise<T> {
+  if (!profilePath) return fn();
+
+  const session = new Session();
+  session.connect();
+  await session.post('Profiler.enable');
+  await session.post('Profiler.start');
+  try {
+    return await fn();
+  } finally {
+    const { profile } = await session.post('Profiler.stop');
+    session.disconnect();
+    await fs.writeFile(profilePath, JSON.stringify(profile));
+    logger.info({ profilePath }, 'CPU profile written');
+  }
 }
 
 // Run if executed directly
@@ -284,7 +321,7 @@ if (isDirectExecution(import.meta.url)) {
   const monthlyCronSchedule = process.env.GIT_MONTHLY_CRON_SCHEDULE || GIT_ACTIVITY.DEFAULT_MONTHLY_CRON; // 1st of month 8 AM
 
   const args = process.argv.slice(PROCESS.ARGV_START);
-  const { options, runNow, errors } = parseGitActivityCliArgs(args, config.runOnStartup);
+  const { options, runNow, profilePath, errors } = parseGitActivityCliArgs(args, config.runOnStartup);
   if (errors.length > 0) {
     logger.error({ args, errors }, 'Invalid CLI options');
     process.exit(1);
@@ -298,7 +335,7 @@ if (isDirectExecution(import.meta.url)) {
       options.reportType = GIT_ACTIVITY.DEFAULT_REPORT_TYPE;
     }
 
-    pipeline.runReport(options)
+    withCpuProfile(profilePath, () => pipeline.runReport(options))
       .then(() => {
         logger.info('Report completed successfully');
         process.exit(0);
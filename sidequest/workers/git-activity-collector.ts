@@ -15,6 +15,11 @@ import { z } from 'zod';
 
 const logger = createComponentLogger('GitActivityCollector');
 
+/** Resolved once; every default path and parent grouping hangs off it */
+const HOME_DIR = os.homedir();
+const DEFAULT_CODE_DIR = path.join(HOME_DIR, 'code');
+const DEFAULT_REPORTS_DIR = path.join(HOME_DIR, 'reports');
+
 // ---------------------------------------------------------------------------
 // Chart constants (from Python's ChartDefaults / ChartColors)
 // ---------------------------------------------------------------------------
@@ -68,6 +73,10 @@ const REPORT_DEFAULTS = {
   SEPARATOR_LENGTH: 60,
   ISO_DATE_FORMAT: 'yyyy-MM-dd',
   DEFAULT_MAX_DEPTH: 3,
+  /** Concurrent `git log` processes when collecting repo stats */
+  DEFAULT_MAX_JOBS: 8,
+  /** File names whose language is remembered per mapping */
+  LANGUAGE_CACHE_MAX_ENTRIES: 8192,
 } as const;
 
 const MATH = {
@@ -75,10 +84,26 @@ const MATH = {
   PERCENT: 100,
   DEGREES_PER_HALF_CIRCLE: 180,
   PAD_WIDTH: 2,
-  MIN_NUMSTAT_PARTS: 2,
+  NUMSTAT_PATH_INDEX: 2,
   MS_PER_DAY: TIME_MS.DAY,
 } as const;
 
+// ---------------------------------------------------------------------------
+// Default project categories (fallback when config has none)
+// ---------------------------------------------------------------------------
+const LEGACY_CATEGORY = 'Legacy';
+const FALLBACK_CATEGORY = 'Client Work';
+
+const DEFAULT_PROJECT_CATEGORIES: ResolvedConfig['projectCategories'] = {
+  'Data & Analytics': { keywords: ['scraper', 'analytics', 'bot'] },
+  'Personal Sites': { keywords: ['personalsite', 'github.io'] },
+  'Infrastructure': { keywords: ['integrity', 'studio', 'visualizer'] },
+  'MCP Servers': { keywords: ['mcp', 'server'] },
+  [FALLBACK_CATEGORY]: { keywords: [] },
+  'Business Apps': { keywords: ['inventory', 'financial'] },
+  [LEGACY_CATEGORY]: { keywords: [] },
+};
+
 // ---------------------------------------------------------------------------
 // Default language extensions (fallback when config has none)
 // ---------------------------------------------------------------------------
@@ -115,6 +140,7 @@ const ScanningConfigSchema = z.object({
   additional_repositories: z.array(z.string()).optional(),
   include_dotfiles: z.boolean().optional(),
   max_depth: z.number().optional(),
+  max_jobs: z.number().int().positive().optional(),
   exclude_patterns: z.array(z.string()).optional(),
 }).optional();
 
@@ -149,6 +175,7 @@ export interface ResolvedConfig {
   additionalRepos: string[];
   includeDotfiles: boolean;
   maxDepth: number;
+  maxJobs: number;
   excludePatterns: string[];
   personalSiteDir: string;
   workCollection: string;
@@ -166,7 +193,9 @@ export interface RepoStats {
   parent: string | null;
   commits: number;
   monthlyCommits: Record<string, number>;
-  files: string[];
+  /** Touched-file entries across all commits; names are not kept */
+  fileCount: number;
+  languages: Record<string, number>;
   additions: number;
   deletions: number;
 }
@@ -202,41 +231,45 @@ export async function loadGitReportConfig(): Promise<GitReportConfig> {
 }
 
 export function resolveConfig(config: GitReportConfig): ResolvedConfig {
-  const homeDir = os.homedir();
   const scanning = config.scanning ?? {};
   const output = config.output ?? {};
 
   const resolvePath = (val: string | undefined, fallback: string): string => {
     if (val && val.trim()) {
-      return val.startsWith('~') ? path.join(homeDir, val.slice(1)) : val;
+      return val.startsWith('~') ? path.join(HOME_DIR, val.slice(1)) : val;
     }
     return fallback;
   };
 
   const defaultAdditional = [
-    path.join(homeDir, 'schema-org-file-system'),
-    path.join(homeDir, 'claude-tool-use'),
-    path.join(homeDir, 'dotfiles'),
+    path.join(HOME_DIR, 'schema-org-file-system'),
+    path.join(HOME_DIR, 'claude-tool-use'),
+    path.join(HOME_DIR, 'dotfiles'),
   ];
 
   const additionalRaw = scanning.additional_repositories ?? defaultAdditional.map(String);
   const additionalRepos = additionalRaw
     .filter((r) => typeof r === 'string' && r.trim())
-    .map((r) => r.startsWith('~') ? path.join(homeDir, r.slice(1)) : r);
+    .map((r) => r.startsWith('~') ? path.join(HOME_DIR, r.slice(1)) : r);
 
   return {
-    codeDir: resolvePath(scanning.code_directory, path.join(homeDir, 'code')),
-    reportsDir: resolvePath(scanning.reports_directory, path.join(homeDir, 'reports')),
+    codeDir: resolvePath(scanning.code_directory, DEFAULT_CODE_DIR),
+    reportsDir: resolvePath(scanning.reports_directory, DEFAULT_REPORTS_DIR),
     additionalRepos,
     includeDotfiles: scanning.include_dotfiles ?? true,
     maxDepth: scanning.max_depth ?? REPORT_DEFAULTS.DEFAULT_MAX_DEPTH,
+    maxJobs: scanning.max_jobs ?? REPORT_DEFAULTS.DEFAULT_MAX_JOBS,
     excludePatterns: scanning.exclude_patterns ?? ['vim/bundle', 'node_modules', '.git', 'venv', '.venv'],
-    personalSiteDir: resolvePath(output.personalsite_dir, path.join(homeDir, 'code', 'PersonalSite')),
+    personalSiteDir: resolvePath(output.personalsite_dir, path.join(HOME_DIR, 'code', 'PersonalSite')),
     workCollection: output.work_collection && output.work_collection.trim() ? output.work_collection : '_reports',
     visualizationDirTemplate: output.visualization_dir && output.visualization_dir.trim()
       ? output.visualization_dir
       : 'assets/images/git-activity-{year}',
-    projectCategories: config.project_categories ?? {},
+    projectCategories: Object.fromEntries(
+      Object.entries(config.project_categories ?? {}).map(([cat, { keywords, min_commits, max_commits }]) => [
+        cat, { keywords, minCommits: min_commits, maxCommits: max_commits },
+      ]),
+    ),
     languageMapping: config.language_mapping ?? DEFAULT_LANGUAGE_EXTENSIONS,
   };
 }
@@ -244,24 +277,58 @@ export function resolveConfig(config: GitReportConfig): ResolvedConfig {
 // ---------------------------------------------------------------------------
 // Repository discovery
 // ---------------------------------------------------------------------------
-async function scanDirForGitRepos(dir: string, maxDepth: number, excludePatterns: string[]): Promise<string[]> {
-  try {
-    await fs.access(dir);
-  } catch {
-    return [];
-  }
+function escapeRegExp(str: string): string {
+  return str.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
 
-  const { stdout } = await execCommandOrThrow('find', [
-    dir, '-maxdepth', String(maxDepth), '-name', '.git', '-type', 'd',
-  ]);
+/**
+ * Compile exclude patterns into one test. A pattern must span whole path
+ * components, so `build` excludes `.../build` but not `.../rebuild`, and
+ * `.git` no longer swallows `user.github.io`. A leading dot on the first
+ * component is optional, so `vim/bundle` still covers `~/.vim/bundle`.
+ */
+function compileExcludePatterns(excludePatterns: string[]): (p: string) => boolean {
+  const alternatives = excludePatterns.map((pat) => pat.replace(/^\/+|\/+$/g, '')).filter(Boolean);
+  if (alternatives.length === 0) return () => false;
+  const pattern = new RegExp(`(?:^|/)\\.?(?:${alternatives.map(escapeRegExp).join('|')})(?=/|$)`);
+  return (p) => pattern.test(p);
+}
 
-  return stdout.trim().split('\n')
-    .filter((line) => line.trim())
-    .map((line) => path.dirname(line.trim()))
-    .filter((repoPath) => !excludePatterns.some((pat) => repoPath.includes(pat)));
+/**
+ * Depth-limited walk for `.git` directories, equivalent to
+ * `find <dir> -maxdepth <maxDepth> -name .git -type d`. Excluded paths are
+ * pruned before descending: a pattern in a directory's path is also in the
+ * path of every repo below it.
+ */
+async function scanDirForGitRepos(
+  dir: string,
+  maxDepth: number,
+  isExcluded: (p: string) => boolean,
+): Promise<string[]> {
+  const walk = async (current: string, depth: number): Promise<string[]> => {
+    // Entries of `current` sit at depth + 1
+    if (depth >= maxDepth) return [];
+    let entries;
+    try {
+      entries = await fs.readdir(current, { withFileTypes: true });
+    } catch {
+      return [];
+    }
+
+    const found = await Promise.all(entries.map(async (entry): Promise<string[]> => {
+      if (!entry.isDirectory()) return [];
+      // Report the repo but never walk its object store
+      if (entry.name === '.git') return [current];
+      const child = path.join(current, entry.name);
+      return isExcluded(child) ? [] : walk(child, depth + 1);
+    }));
+    return found.flat();
+  };
+
+  return isExcluded(dir) ? [] : walk(dir, 0);
 }
 
-async function scanDotfileRepos(homeDir: string, excludePatterns: string[]): Promise<string[]> {
+async function scanDotfileRepos(homeDir: string, isExcluded: (p: string) => boolean): Promise<string[]> {
   const repos: string[] = [];
   let entries: string[];
   try {
@@ -280,7 +347,7 @@ async function scanDotfileRepos(homeDir: string, excludePatterns: string[]): Pro
       continue;
     }
 
-    if (excludePatterns.some((pat) => fullPath.includes(pat))) continue;
+    if (isExcluded(fullPath)) continue;
 
     // Check if directory itself is a git repo
     try {
@@ -298,7 +365,7 @@ async function scanDotfileRepos(homeDir: string, excludePatterns: string[]): Pro
           const subStat = await fs.stat(subPath);
           if (!subStat.isDirectory()) continue;
           await fs.access(path.join(subPath, '.git'));
-          if (!excludePatterns.some((pat) => subPath.includes(pat))) {
+          if (!isExcluded(subPath)) {
             repos.push(subPath);
           }
         } catch {
@@ -316,20 +383,21 @@ async function scanDotfileRepos(homeDir: string, excludePatterns: string[]): Pro
 export async function findGitRepos(config: ResolvedConfig): Promise<string[]> {
   const { codeDir, reportsDir, additionalRepos, includeDotfiles, maxDepth, excludePatterns } = config;
   const repoSet = new Set<string>();
+  const isExcluded = compileExcludePatterns(excludePatterns);
 
   logger.info({ codeDir, maxDepth }, 'Scanning for repositories');
 
   // Scan code directory
-  const codeRepos = await scanDirForGitRepos(codeDir, maxDepth, excludePatterns);
+  const codeRepos = await scanDirForGitRepos(codeDir, maxDepth, isExcluded);
   for (const r of codeRepos) repoSet.add(r);
 
   // Scan reports directory
-  const reportRepos = await scanDirForGitRepos(reportsDir, maxDepth, excludePatterns);
+  const reportRepos = await scanDirForGitRepos(reportsDir, maxDepth, isExcluded);
   for (const r of reportRepos) repoSet.add(r);
 
   // Scan dotfiles
   if (includeDotfiles) {
-    const dotRepos = await scanDotfileRepos(os.homedir(), excludePatterns);
+    const dotRepos = await scanDotfileRepos(HOME_DIR, isExcluded);
     for (const r of dotRepos) repoSet.add(r);
   }
 
@@ -351,65 +419,93 @@ export async function findGitRepos(config: ResolvedConfig): Promise<string[]> {
 // ---------------------------------------------------------------------------
 // Repository stats
 // ---------------------------------------------------------------------------
-export async function getRepoStats(
-  repoPath: string,
-  sinceDate: string,
-  untilDate?: string,
-  config?: ResolvedConfig,
-): Promise<RepoStats> {
-  const baseArgs = ['log', `--since=${sinceDate}`, '--all'];
-  if (untilDate) baseArgs.push(`--until=${untilDate}`);
+// Each commit header is a NUL followed by its %Y-%m date; file paths never
+// start with NUL, so header lines are unambiguous in --numstat output.
+const LOG_COMMIT_MARKER = '\x00';
+const RENAME_ARROW = ' => ';
+const RENAME_BRACE_PATTERN = /\{([^{}]*) => ([^{}]*)\}/;
 
-  const cwd = repoPath;
+/**
+ * Post-rename path from a --numstat entry, matching what --name-only
+ * prints: `a/{old => new}/f` -> `a/new/f`, `old => new` -> `new`.
+ */
+function resolveRenamedPath(filePath: string): string {
+  if (!filePath.includes(RENAME_ARROW)) return filePath;
+  const match = RENAME_BRACE_PATTERN.exec(filePath);
+  if (!match) return filePath.slice(filePath.indexOf(RENAME_ARROW) + RENAME_ARROW.length);
+  const before = filePath.slice(0, match.index);
+  const after = filePath.slice(match.index + match[0].length);
+  // `a/{sub => }/f` renames into `a/f`: drop the doubled separator
+  return match[2] ? before + match[2] + after : before + after.replace(/^\//, '');
+}
 
-  // Commit count
-  const { stdout: onelineOut } = await execCommandOrThrow('git', [...baseArgs, '--oneline'], { cwd });
-  const commits = onelineOut.trim() ? onelineOut.trim().split('\n').length : 0;
+export type RepoLogStats = Pick<
+  RepoStats, 'commits' | 'monthlyCommits' | 'fileCount' | 'languages' | 'additions' | 'deletions'
+>;
 
-  // Monthly distribution
-  const { stdout: monthlyOut } = await execCommandOrThrow('git', [
-    ...baseArgs, '--date=format:%Y-%m', '--pretty=format:%ad',
-  ], { cwd });
+/**
+ * Parse one `git log --pretty=format:%x00%ad --date=format:%Y-%m --numstat`
+ * pass into commit, month, file, language and line counts. Files are
+ * classified as they are read rather than collected.
+ */
+export function parseRepoLog(
+  stdout: string,
+  languageMapping: Record<string, string[]> = DEFAULT_LANGUAGE_EXTENSIONS,
+): RepoLogStats {
+  let commits = 0;
   const monthlyCommits: Record<string, number> = {};
-  for (const line of monthlyOut.trim().split('\n')) {
-    const month = line.trim();
-    if (month) {
-      monthlyCommits[month] = (monthlyCommits[month] ?? 0) + 1;
-    }
-  }
-
-  // File names
-  const { stdout: namesOut } = await execCommandOrThrow('git', [
-    ...baseArgs, '--name-only', '--pretty=format:',
-  ], { cwd });
-  const files = namesOut.trim().split('\n').filter((f) => f.trim());
-
-  // Line stats
-  const { stdout: numstatOut } = await execCommandOrThrow('git', [
-    ...baseArgs, '--numstat', '--pretty=format:',
-  ], { cwd });
+  let fileCount = 0;
+  const languages: Record<string, number> = {};
+  const index = getLanguageIndex(languageMapping);
   let additions = 0;
   let deletions = 0;
-  for (const line of numstatOut.trim().split('\n')) {
+
+  for (const line of stdout.split('\n')) {
+    if (line.startsWith(LOG_COMMIT_MARKER)) {
+      commits++;
+      const month = line.slice(LOG_COMMIT_MARKER.length).trim();
+      if (month) monthlyCommits[month] = (monthlyCommits[month] ?? 0) + 1;
+      continue;
+    }
+
     const parts = line.split('\t');
-    if (parts.length < MATH.MIN_NUMSTAT_PARTS) continue;
+    if (parts.length <= MATH.NUMSTAT_PATH_INDEX) continue;
+    fileCount++;
+    countLanguage(languages, resolveRenamedPath(parts.slice(MATH.NUMSTAT_PATH_INDEX).join('\t')), index);
+    // Binary files report '-' for both counts
     if (/^\d+$/.test(parts[0])) additions += Number(parts[0]);
     if (/^\d+$/.test(parts[1])) deletions += Number(parts[1]);
   }
 
-  // Determine parent grouping
-  const homeDir = os.homedir();
-  const codeDir = config?.codeDir ?? path.join(homeDir, 'code');
-  const reportsDir = config?.reportsDir ?? path.join(homeDir, 'reports');
+  return { commits, monthlyCommits, fileCount, languages, additions, deletions };
+}
+
+export async function getRepoStats(
+  repoPath: string,
+  sinceDate: string,
+  untilDate?: string,
+  config?: ResolvedConfig,
+): Promise<RepoStats> {
+  const args = ['log', `--since=${sinceDate}`, '--all'];
+  if (untilDate) args.push(`--until=${untilDate}`);
+  // One pass yields commits, months, files and line counts
+  args.push('--date=format:%Y-%m', `--pretty=format:%x00%ad`, '--numstat');
+
+  const { stdout } = await execCommandOrThrow('git', args, { cwd: repoPath });
+  const { commits, monthlyCommits, fileCount, languages, additions, deletions } = parseRepoLog(
+    stdout, config?.languageMapping,
+  );
+
+  // Determine parent grouping: top-level repos have none, home-level repos show '~'
+  const codeDir = config?.codeDir ?? DEFAULT_CODE_DIR;
+  const reportsDir = config?.reportsDir ?? DEFAULT_REPORTS_DIR;
   const parentDir = path.dirname(repoPath);
   let parent: string | null;
 
   if (parentDir === codeDir || parentDir === reportsDir) {
     parent = null;
-  } else if (parentDir === homeDir) {
+  } else if (parentDir === HOME_DIR) {
     parent = '~';
-  } else if (parentDir.startsWith(homeDir) && path.dirname(parentDir) === homeDir) {
-    parent = path.basename(parentDir);
   } else {
     parent = path.basename(parentDir);
   }
@@ -420,61 +516,129 @@ export async function getRepoStats(
     parent,
     commits,
     monthlyCommits,
-    files,
+    fileCount,
+    languages,
     additions,
     deletions,
   };
 }
 
+/**
+ * Collect stats for every repo with at most `config.maxJobs` git processes
+ * in flight. Results keep discovery order; repos that fail are skipped.
+ */
+export async function collectRepoStats(
+  repos: string[],
+  sinceDate: string,
+  untilDate: string | undefined,
+  config: ResolvedConfig,
+): Promise<RepoStats[]> {
+  const results: Array<RepoStats | null> = new Array(repos.length).fill(null);
+  let next = 0;
+
+  const runNext = async (): Promise<void> => {
+    while (next < repos.length) {
+      const i = next++;
+      try {
+        results[i] = await getRepoStats(repos[i], sinceDate, untilDate, config);
+      } catch (err) {
+        logger.warn({ repoPath: repos[i], error: (err as Error).message }, 'Failed to get repo stats, skipping');
+      }
+    }
+  };
+
+  const jobs = Math.max(1, Math.min(config.maxJobs, repos.length));
+  await Promise.all(Array.from({ length: jobs }, runNext));
+  return results.filter((stats): stats is RepoStats => stats !== null);
+}
+
 // ---------------------------------------------------------------------------
 // Language analysis
 // ---------------------------------------------------------------------------
-export function analyzeLanguages(
-  allFiles: string[],
-  languageMapping: Record<string, string[]>,
-): Record<string, number> {
-  const stats: Record<string, number> = {};
+interface LanguageIndex {
+  languages: string[];
+  /** Extension or file name -> position of the first language listing it */
+  positions: Map<string, number>;
+  /** File name -> language, 'Other', or null when it has no extension */
+  byName: Map<string, string | null>;
+}
 
-  for (const filePath of allFiles) {
-    const ext = path.extname(filePath).toLowerCase();
-    const fileName = path.basename(filePath);
-    let found = false;
+const languageIndexCache = new WeakMap<Record<string, string[]>, LanguageIndex>();
 
-    for (const [language, extensions] of Object.entries(languageMapping)) {
-      if (extensions.includes(ext) || extensions.includes(fileName)) {
-        stats[language] = (stats[language] ?? 0) + 1;
-        found = true;
-        break;
-      }
-    }
+function getLanguageIndex(languageMapping: Record<string, string[]>): LanguageIndex {
+  const cached = languageIndexCache.get(languageMapping);
+  if (cached) return cached;
 
-    if (!found && ext) {
-      stats['Other'] = (stats['Other'] ?? 0) + 1;
+  const positions = new Map<string, number>();
+  Object.values(languageMapping).forEach((extensions, position) => {
+    for (const ext of extensions) {
+      if (!positions.has(ext)) positions.set(ext, position);
     }
+  });
+  const index = { languages: Object.keys(languageMapping), positions, byName: new Map() };
+  languageIndexCache.set(languageMapping, index);
+  return index;
+}
+
+function classifyFileName(name: string, index: LanguageIndex): string | null {
+  const cached = index.byName.get(name);
+  if (cached !== undefined) return cached;
+
+  // Same results as path.extname for git's slash-separated paths
+  const dot = name.lastIndexOf('.');
+  const ext = dot > 0 && name !== '..' ? name.slice(dot).toLowerCase() : '';
+  const byExt = index.positions.get(ext);
+  const byName = index.positions.get(name);
+  // A name match only wins when its language comes first in the mapping
+  const position = byName === undefined || (byExt !== undefined && byExt < byName) ? byExt : byName;
+  const language = position !== undefined ? index.languages[position] : ext ? 'Other' : null;
+
+  // Names repeat heavily across repos (package.json, README.md); drop the oldest past the cap
+  if (index.byName.size >= REPORT_DEFAULTS.LANGUAGE_CACHE_MAX_ENTRIES) {
+    const oldest = index.byName.keys().next().value;
+    if (oldest !== undefined) index.byName.delete(oldest);
   }
+  index.byName.set(name, language);
+  return language;
+}
 
+function countLanguage(stats: Record<string, number>, filePath: string, index: LanguageIndex): void {
+  const language = classifyFileName(filePath.slice(filePath.lastIndexOf('/') + 1), index);
+  if (language !== null) stats[language] = (stats[language] ?? 0) + 1;
+}
+
+export function analyzeLanguages(
+  allFiles: string[],
+  languageMapping: Record<string, string[]>,
+): Record<string, number> {
+  const stats: Record<string, number> = {};
+  const index = getLanguageIndex(languageMapping);
+  for (const filePath of allFiles) countLanguage(stats, filePath, index);
   return stats;
 }
 
 // ---------------------------------------------------------------------------
 // Website discovery
 // ---------------------------------------------------------------------------
+async function readCname(repoPath: string): Promise<string | null> {
+  try {
+    const website = (await fs.readFile(path.join(repoPath, 'CNAME'), 'utf-8')).trim();
+    return website && website.includes('.') ? website : null;
+  } catch {
+    return null; // no CNAME file
+  }
+}
+
 export async function findProjectWebsites(
   repositories: RepoStats[],
 ): Promise<Record<string, string>> {
+  // Reads are independent; issue them together rather than one per await
+  const cnames = await Promise.all(repositories.map((repo) => readCname(repo.path)));
   const websites: Record<string, string> = {};
-  for (const repo of repositories) {
-    const cnamePath = path.join(repo.path, 'CNAME');
-    try {
-      const content = await fs.readFile(cnamePath, 'utf-8');
-      const website = content.trim();
-      if (website && website.includes('.')) {
-        websites[repo.name] = `https://${website}`;
-      }
-    } catch {
-      // no CNAME file
-    }
-  }
+  repositories.forEach((repo, i) => {
+    const website = cnames[i];
+    if (website) websites[repo.name] = `https://${website}`;
+  });
   return websites;
 }
 
@@ -485,53 +649,23 @@ export function categorizeRepositories(
   repositories: RepoStats[],
   projectCategories: ResolvedConfig['projectCategories'],
 ): Record<string, Array<{ name: string; commits: number }>> {
-  const defaultCategories: Record<string, { keywords: string[] }> = {
-    'Data & Analytics': { keywords: ['scraper', 'analytics', 'bot'] },
-    'Personal Sites': { keywords: ['personalsite', 'github.io'] },
-    'Infrastructure': { keywords: ['integrity', 'studio', 'visualizer'] },
-    'MCP Servers': { keywords: ['mcp', 'server'] },
-    'Client Work': { keywords: [] },
-    'Business Apps': { keywords: ['inventory', 'financial'] },
-    'Legacy': { keywords: [] },
-  };
-
-  const categories = Object.keys(projectCategories).length > 0 ? projectCategories : defaultCategories;
+  const categories = Object.keys(projectCategories).length > 0 ? projectCategories : DEFAULT_PROJECT_CATEGORIES;
   const result: Record<string, Array<{ name: string; commits: number }>> = {};
   for (const cat of Object.keys(categories)) {
     result[cat] = [];
   }
 
+  // Keyword rules in config order; Legacy is decided by commit count, never by keyword
+  const rules = Object.entries(categories)
+    .filter(([cat, catConfig]) => cat !== LEGACY_CATEGORY && catConfig.keywords.length > 0)
+    .map(([cat, catConfig]) => ({ cat, keywords: catConfig.keywords }));
+  const legacyThreshold = categories[LEGACY_CATEGORY]?.maxCommits ?? REPORT_DEFAULTS.LEGACY_COMMIT_THRESHOLD;
+
   for (const repo of repositories) {
     const nameLower = repo.name.toLowerCase();
-    let categorized = false;
-
-    for (const [cat, catConfig] of Object.entries(categories)) {
-      if (cat === 'Legacy') continue; // handle Legacy last
-      const keywords = catConfig.keywords;
-      if (keywords.length > 0 && keywords.some((kw) => nameLower.includes(kw))) {
-        result[cat].push({ name: repo.name, commits: repo.commits });
-        categorized = true;
-        break;
-      }
-    }
-
-    if (!categorized) {
-      const legacyConfig = categories['Legacy'];
-      const maxCommits = legacyConfig && 'maxCommits' in legacyConfig
-        ? legacyConfig.maxCommits
-        : undefined;
-      const threshold = typeof maxCommits === 'number'
-        ? maxCommits
-        : REPORT_DEFAULTS.LEGACY_COMMIT_THRESHOLD;
-
-      if (repo.commits < threshold) {
-        result['Legacy'] = result['Legacy'] ?? [];
-        result['Legacy'].push({ name: repo.name, commits: repo.commits });
-      } else {
-        result['Client Work'] = result['Client Work'] ?? [];
-        result['Client Work'].push({ name: repo.name, commits: repo.commits });
-      }
-    }
+    const rule = rules.find(({ keywords }) => keywords.some((kw) => nameLower.includes(kw)));
+    const cat = rule ? rule.cat : repo.commits < legacyThreshold ? LEGACY_CATEGORY : FALLBACK_CATEGORY;
+    (result[cat] ??= []).push({ name: repo.name, commits: repo.commits });
   }
 
   return result;
@@ -542,15 +676,26 @@ export function categorizeRepositories(
 // ---------------------------------------------------------------------------
 export function compileActivityData(
   repositories: RepoStats[],
-  allFiles: string[],
   sinceDate: string,
   untilDate: string | undefined,
   config: ResolvedConfig,
+  now: Date = new Date(),
 ): ActivityData {
-  const languages = analyzeLanguages(allFiles, config.languageMapping);
-
+  // One pass over the repos accumulates every total
+  const languages: Record<string, number> = {};
   const monthlyTotals: Record<string, number> = {};
+  let totalCommits = 0;
+  let totalAdditions = 0;
+  let totalDeletions = 0;
+  let totalFiles = 0;
   for (const repo of repositories) {
+    totalCommits += repo.commits;
+    totalAdditions += repo.additions;
+    totalDeletions += repo.deletions;
+    totalFiles += repo.fileCount;
+    for (const [language, count] of Object.entries(repo.languages)) {
+      languages[language] = (languages[language] ?? 0) + count;
+    }
     for (const [month, count] of Object.entries(repo.monthlyCommits)) {
       monthlyTotals[month] = (monthlyTotals[month] ?? 0) + count;
     }
@@ -566,13 +711,13 @@ export function compileActivityData(
   return {
     date_range: {
       start: sinceDate,
-      end: untilDate ?? formatDate(new Date()),
+      end: untilDate ?? formatDate(now),
     },
-    total_commits: repositories.reduce((sum, r) => sum + r.commits, 0),
-    total_additions: repositories.reduce((sum, r) => sum + r.additions, 0),
-    total_deletions: repositories.reduce((sum, r) => sum + r.deletions, 0),
+    total_commits: totalCommits,
+    total_additions: totalAdditions,
+    total_deletions: totalDeletions,
     total_repositories: repositories.length,
-    total_files: allFiles.length,
+    total_files: totalFiles,
     repositories,
     languages,
     websites: {}, // populated async separately
@@ -602,6 +747,10 @@ export function createPieChartSvg(
   ];
 
   let startAngle = 0;
+  // Each slice starts where the previous one ended, so only the end point needs trig
+  const startRad = (startAngle - CHART.SVG_ANGLE_OFFSET) * Math.PI / MATH.DEGREES_PER_HALF_CIRCLE;
+  let x1 = cx + radius * Math.cos(startRad);
+  let y1 = cy + radius * Math.sin(startRad);
   let legendY = CHART.MARGIN_TOP;
   let i = 0;
 
@@ -612,11 +761,7 @@ export function createPieChartSvg(
     const angle = (value / total) * CHART.FULL_CIRCLE_DEGREES;
     const endAngle = startAngle + angle;
 
-    const startRad = (startAngle - CHART.SVG_ANGLE_OFFSET) * Math.PI / MATH.DEGREES_PER_HALF_CIRCLE;
     const endRad = (endAngle - CHART.SVG_ANGLE_OFFSET) * Math.PI / MATH.DEGREES_PER_HALF_CIRCLE;
-
-    const x1 = cx + radius * Math.cos(startRad);
-    const y1 = cy + radius * Math.sin(startRad);
     const x2 = cx + radius * Math.cos(endRad);
     const y2 = cy + radius * Math.sin(endRad);
 
@@ -632,6 +777,8 @@ export function createPieChartSvg(
     legendY += CHART.LEGEND_SPACING_Y;
 
     startAngle = endAngle;
+    x1 = x2;
+    y1 = y2;
     i++;
   }
 
@@ -682,19 +829,15 @@ export async function generateVisualizations(
 ): Promise<string[]> {
   logger.info({ outputDir }, 'Generating SVG visualizations');
   await fs.mkdir(outputDir, { recursive: true });
-  const files: string[] = [];
+  // [file name, svg]; empty charts are dropped before writing
+  const charts: Array<[string, string]> = [];
 
   // Monthly commits pie chart
   if (Object.keys(data.monthly).length > 0) {
-    const svg = createPieChartSvg(
+    charts.push(['monthly-commits.svg', createPieChartSvg(
       data.monthly,
       `Commits by Month (${data.total_commits} total)`,
-    );
-    if (svg) {
-      const filePath = path.join(outputDir, 'monthly-commits.svg');
-      await fs.writeFile(filePath, svg);
-      files.push(filePath);
-    }
+    )]);
   }
 
   // Top repositories bar chart
@@ -703,15 +846,10 @@ export async function generateVisualizations(
     const name = repo.parent ? `${repo.parent}/${repo.name}` : repo.name;
     top10[name] = repo.commits;
   }
-  const barSvg = createBarChartSvg(
+  charts.push(['top-10-repos.svg', createBarChartSvg(
     top10,
     `Top ${REPORT_DEFAULTS.TOP_N_TABLE_DISPLAY} Repositories by Commits`,
-  );
-  if (barSvg) {
-    const filePath = path.join(outputDir, 'top-10-repos.svg');
-    await fs.writeFile(filePath, barSvg);
-    files.push(filePath);
-  }
+  )]);
 
   // Category pie chart
   const categoryData: Record<string, number> = {};
@@ -719,33 +857,26 @@ export async function generateVisualizations(
     if (repos.length > 0) categoryData[cat] = repos.length;
   }
   if (Object.keys(categoryData).length > 0) {
-    const svg = createPieChartSvg(
+    charts.push(['project-categories.svg', createPieChartSvg(
       categoryData,
       `Project Categories (${data.total_repositories} repos)`,
-    );
-    if (svg) {
-      const filePath = path.join(outputDir, 'project-categories.svg');
-      await fs.writeFile(filePath, svg);
-      files.push(filePath);
-    }
+    )]);
   }
 
   // Language distribution pie chart
   if (Object.keys(data.languages).length > 0) {
     const total = Object.values(data.languages).reduce((s, v) => s + v, 0);
-    const svg = createPieChartSvg(
+    charts.push(['language-distribution.svg', createPieChartSvg(
       data.languages,
       `File Changes by Language (${total} total)`,
       CHART.WIDE_WIDTH,
-    );
-    if (svg) {
-      const filePath = path.join(outputDir, 'language-distribution.svg');
-      await fs.writeFile(filePath, svg);
-      files.push(filePath);
-    }
+    )]);
   }
 
-  return files;
+  // The files are independent, so write them together
+  const files = charts.filter(([, svg]) => svg).map(([name, svg]) => [path.join(outputDir, name), svg]);
+  await Promise.all(files.map(([filePath, svg]) => fs.writeFile(filePath, svg)));
+  return files.map(([filePath]) => filePath);
 }
 
 // ---------------------------------------------------------------------------
@@ -769,11 +900,11 @@ export interface JekyllReportResult {
 export async function generateJekyllReport(
   data: ActivityData,
   outputFile: string,
+  now: Date = new Date(),
 ): Promise<JekyllReportResult> {
   const { start: startDate, end: endDate } = data.date_range;
-  const start = new Date(startDate);
-  const end = new Date(endDate);
-  const days = Math.round((end.getTime() - start.getTime()) / MATH.MS_PER_DAY);
+  // ISO dates parse straight to epoch ms; no Date objects needed for a span
+  const days = Math.round((Date.parse(endDate) - Date.parse(startDate)) / MATH.MS_PER_DAY);
 
   let reportType: string;
   if (days <= REPORT_DEFAULTS.WEEKLY_WINDOW_DAYS) {
@@ -784,99 +915,97 @@ export async function generateJekyllReport(
     reportType = `${days}-Day`;
   }
 
-  const reportDate = formatDate(new Date());
-  const now = formatDateTime(new Date());
+  const reportDate = formatDate(now);
+  const generatedAt = formatDateTime(now);
   const slug = path.basename(outputFile).replace(/\.(md|markdown)$/, '');
   const permalink = `/work/${slug}/`;
 
-  const frontmatter = `---
-layout: single
-title: "${reportType} Git Activity Report: ${startDate} to ${endDate}"
-date: ${reportDate}
-permalink: ${permalink}
-author_profile: true
-breadcrumbs: true
-categories: [git-activity, development-metrics]
-tags: [git, commits, repositories, weekly-report, automation]
-excerpt: "${data.total_commits} commits across ${data.total_repositories} repositories with ${data.total_files} file changes."
-header:
-  image: /assets/images/cover-reports.png
----
-`;
-
-  let content = `
-**Report Period**: ${startDate} to ${endDate}
-**Generated**: ${now}
-**Report Type**: Automated Git Activity Analysis
-
-## Executive Summary
-
-| Metric | Value |
-|--------|-------|
-| Total Commits | ${data.total_commits} |
-| Active Repositories | ${data.total_repositories} |
-| Files Changed | ${data.total_files} |
-| Languages Detected | ${Object.keys(data.languages).length} |
-
-## Top Repositories by Commits
-
-| Repository | Commits |
-|------------|---------|
-`;
+  const lines: string[] = [
+    '---',
+    'layout: single',
+    `title: "${reportType} Git Activity Report: ${startDate} to ${endDate}"`,
+    `date: ${reportDate}`,
+    `permalink: ${permalink}`,
+    'author_profile: true',
+    'breadcrumbs: true',
+    'categories: [git-activity, development-metrics]',
+    'tags: [git, commits, repositories, weekly-report, automation]',
+    `excerpt: "${data.total_commits} commits across ${data.total_repositories} repositories with ${data.total_files} file changes."`,
+    'header:',
+    '  image: /assets/images/cover-reports.png',
+    '---',
+    '',
+    `**Report Period**: ${startDate} to ${endDate}`,
+    `**Generated**: ${generatedAt}`,
+    '**Report Type**: Automated Git Activity Analysis',
+    '',
+    '## Executive Summary',
+    '',
+    '| Metric | Value |',
+    '|--------|-------|',
+    `| Total Commits | ${data.total_commits} |`,
+    `| Active Repositories | ${data.total_repositories} |`,
+    `| Files Changed | ${data.total_files} |`,
+    `| Languages Detected | ${Object.keys(data.languages).length} |`,
+    '',
+    '## Top Repositories by Commits',
+    '',
+    '| Repository | Commits |',
+    '|------------|---------|',
+  ];
 
   for (const repo of data.repositories.slice(0, REPORT_DEFAULTS.TOP_N_TABLE_DISPLAY)) {
     const prefix = repo.parent ? `${repo.parent}/` : '';
-    content += `| ${prefix}${repo.name} | ${repo.commits} |\n`;
+    lines.push(`| ${prefix}${repo.name} | ${repo.commits} |`);
   }
 
   // Language breakdown
   if (Object.keys(data.languages).length > 0) {
-    content += '\n## Language Distribution\n\n';
-    content += '| Language | File Changes |\n';
-    content += '|----------|-------------|\n';
+    lines.push('', '## Language Distribution', '', '| Language | File Changes |', '|----------|-------------|');
 
     const sorted = Object.entries(data.languages).sort((a, b) => b[1] - a[1]);
     for (const [lang, count] of sorted.slice(0, REPORT_DEFAULTS.TOP_N_TABLE_DISPLAY)) {
-      content += `| ${lang} | ${count} |\n`;
+      lines.push(`| ${lang} | ${count} |`);
     }
   }
 
   // Categories
   if (Object.keys(data.categories).length > 0) {
-    content += '\n## Project Categories\n\n';
-    content += '| Category | Repositories |\n';
-    content += '|----------|-------------|\n';
+    lines.push('', '## Project Categories', '', '| Category | Repositories |', '|----------|-------------|');
 
     for (const [category, repos] of Object.entries(data.categories)) {
       if (repos.length > 0) {
-        content += `| ${category} | ${repos.length} |\n`;
+        lines.push(`| ${category} | ${repos.length} |`);
       }
     }
   }
 
   // Detailed repo list
-  content += '\n## Repository Details\n\n';
+  lines.push('', '## Repository Details', '');
   for (const repo of data.repositories) {
     const prefix = repo.parent ? `${repo.parent}/` : '';
-    content += `### ${prefix}${repo.name}\n\n`;
-    content += `- **Path**: \`${repo.path}\`\n`;
-    content += `- **Commits**: ${repo.commits}\n`;
-    content += `- **Files Changed**: ${repo.files.length}\n\n`;
+    lines.push(
+      `### ${prefix}${repo.name}`,
+      '',
+      `- **Path**: \`${repo.path}\``,
+      `- **Commits**: ${repo.commits}`,
+      `- **Files Changed**: ${repo.fileCount}`,
+      '',
+    );
   }
 
   // Websites
   if (Object.keys(data.websites).length > 0) {
-    content += '\n## Project Websites\n\n';
+    lines.push('', '## Project Websites', '');
     for (const [name, url] of Object.entries(data.websites)) {
-      content += `- [${name}](${url})\n`;
+      lines.push(`- [${name}](${url})`);
     }
   }
 
-  content += '\n---\n\n';
-  content += '*This report was automatically generated by the AlephAuto Git Activity Pipeline.*\n';
+  lines.push('', '---', '', '*This report was automatically generated by the AlephAuto Git Activity Pipeline.*', '');
 
   await fs.mkdir(path.dirname(outputFile), { recursive: true });
-  await fs.writeFile(outputFile, frontmatter + content);
+  await fs.writeFile(outputFile, lines.join('\n'));
   logger.info({ outputFile, permalink }, 'Jekyll report saved');
   return { permalink };
 }
@@ -884,8 +1013,8 @@ header:
 // ---------------------------------------------------------------------------
 // Output directory resolution
 // ---------------------------------------------------------------------------
-export function resolveOutputDir(config: ResolvedConfig): string {
-  const year = new Date().getFullYear();
+export function resolveOutputDir(config: ResolvedConfig, now: Date = new Date()): string {
+  const year = now.getFullYear();
   const relOrAbs = config.visualizationDirTemplate.replace('{year}', String(year));
   if (path.isAbsolute(relOrAbs)) return relOrAbs;
   return path.join(config.personalSiteDir, relOrAbs);
@@ -9,11 +9,12 @@ import { createComponentLogger, logError } from '../utils/logger.ts';
 import { GIT_ACTIVITY, NUMBER_BASE } from '../core/constants.ts';
 import { TIME_MS } from '../core/units.ts';
 import { nowISO, toISODateString } from '../utils/time-helpers.ts';
+import { createTimer } from '../pipeline-core/utils/timing-helpers.ts';
 import {
   loadGitReportConfig,
   resolveConfig,
   findGitRepos,
-  getRepoStats,
+  collectRepoStats,
   compileActivityData,
   findProjectWebsites,
   generateVisualizations,
@@ -190,6 +191,8 @@ export class GitActivityWorker extends SidequestServer {
 
   async runJobHandler(job: Job): Promise<unknown> {
     const startTime = Date.now();
+    // One clock reading for the date range, every date in the report and its file names
+    const now = new Date(startTime);
     const {
       reportType,
       days,
@@ -214,36 +217,41 @@ export class GitActivityWorker extends SidequestServer {
       untilDate: rawUntilDate
     }, 'Running git activity report');
 
+    // Time per phase on the monotonic clock, logged on completion to show where a run went
+    const phaseTimer = createTimer();
+    const phaseMs: Record<string, number> = {};
+    let phaseStartMs = 0;
+    const endPhase = (phase: string): void => {
+      const elapsedMs = phaseTimer.elapsedMs();
+      phaseMs[phase] = Math.round(elapsedMs - phaseStartMs);
+      phaseStartMs = elapsedMs;
+    };
+
     try {
       // Resolve date range
       const { sinceDate, untilDate } = this.#resolveDateRange({
         reportType, days, sinceDate: rawSinceDate, untilDate: rawUntilDate,
-      });
+      }, now);
 
       // Load config and discover repos
       const rawConfig = await loadGitReportConfig();
       const config = resolveConfig(rawConfig);
       const repos = await findGitRepos(config);
+      endPhase('discover');
 
       // Collect stats from all repos
-      const repositories = [];
-      const allFiles: string[] = [];
-      for (const repoPath of repos) {
-        try {
-          const stats = await getRepoStats(repoPath, sinceDate, untilDate, config);
-          if (stats.commits > 0) {
-            repositories.push(stats);
-            allFiles.push(...stats.files);
-          }
-        } catch (err) {
-          logger.warn({ repoPath, error: (err as Error).message }, 'Failed to get repo stats, skipping');
-        }
-      }
+      const repositories = (await collectRepoStats(repos, sinceDate, untilDate, config))
+        .filter((stats) => stats.commits > 0);
       repositories.sort((a, b) => b.commits - a.commits);
+      endPhase('repoStats');
 
       // Compile activity data
-      const data = compileActivityData(repositories, allFiles, sinceDate, untilDate, config);
-      data.websites = await findProjectWebsites(repositories);
+      // CNAME reads are I/O; start them before the CPU-bound compile so the two overlap
+      const websites = findProjectWebsites(repositories);
+
+      const data = compileActivityData(repositories, sinceDate, untilDate, config, now);
+      data.websites = await websites;
+      endPhase('compile');
 
       const stats = buildStatsFromActivityData(data);
       const outputFiles: string[] = [];
@@ -252,14 +260,14 @@ export class GitActivityWorker extends SidequestServer {
       const wantsMarkdown = outputFormat === 'markdown' || outputFormat === DEFAULT_OUTPUT_FORMAT;
       const wantsJson = outputFormat === 'json' || outputFormat === DEFAULT_OUTPUT_FORMAT;
 
-      const reportDate = toISODateString();
+      const reportDate = toISODateString(now);
 
       let articleUrl: string | null = null;
 
       if (wantsMarkdown) {
         const reportDir = path.join(config.personalSiteDir, config.workCollection);
         const reportFile = path.join(reportDir, `${reportDate}-git-activity-report.md`);
-        const jekyllResult = await generateJekyllReport(data, reportFile);
+        const jekyllResult = await generateJekyllReport(data, reportFile, now);
         articleUrl = `https://www.aledlie.com${jekyllResult.permalink}`;
         outputFiles.push(reportFile);
       }
@@ -273,17 +281,20 @@ export class GitActivityWorker extends SidequestServer {
       }
 
       if (doVisualizations) {
-        const vizDir = resolveOutputDir(config);
+        const vizDir = resolveOutputDir(config, now);
         const vizFiles = await generateVisualizations(data, vizDir);
         outputFiles.push(...vizFiles);
       }
 
+      endPhase('outputs');
+
       // Verify output files exist
       const verifiedFiles = await this.#verifyOutputFiles(outputFiles);
 
       logger.info({
         jobId: job.id,
         stats,
+        phaseMs,
         filesGenerated: verifiedFiles.length
       }, 'Git activity report completed');
 
@@ -323,7 +334,7 @@ export class GitActivityWorker extends SidequestServer {
         verifiedFiles.filter(f => f.exists).map(f => f.path),
         reportType,
         sinceDate,
-        untilDate ?? toISODateString()
+        untilDate ?? toISODateString(now)
       );
       result.published = publishResult;
 
@@ -344,7 +355,7 @@ export class GitActivityWorker extends SidequestServer {
     days?: number;
     sinceDate?: string;
     untilDate?: string;
-  }): { sinceDate: string; untilDate: string | undefined } {
+  }, now: Date): { sinceDate: string; untilDate: string | undefined } {
     if (opts.sinceDate) {
       return { sinceDate: opts.sinceDate, untilDate: opts.untilDate };
     }
@@ -360,19 +371,17 @@ export class GitActivityWorker extends SidequestServer {
       daysBack = GIT_ACTIVITY.WEEKLY_WINDOW_DAYS;
     }
 
-    const start = new Date(Date.now() - daysBack * TIME_MS.DAY);
+    const start = new Date(now.getTime() - daysBack * TIME_MS.DAY);
     return {
       sinceDate: toISODateString(start),
-      untilDate: toISODateString(),
+      untilDate: toISODateString(now),
     };
   }
 
   #calculateDays(sinceDate?: string, untilDate?: string): number | null {
     if (!sinceDate || !untilDate) return null;
 
-    const since = new Date(sinceDate);
-    const until = new Date(untilDate);
-    const diffTime = Math.abs(until.getTime() - since.getTime());
+    const diffTime = Math.abs(Date.parse(untilDate) - Date.parse(sinceDate));
     const diffDays = Math.ceil(diffTime / TIME_MS.DAY);
 
     return diffDays;
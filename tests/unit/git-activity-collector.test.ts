@@ -1,12 +1,18 @@
 import test from 'node:test';
 import assert from 'node:assert/strict';
+import fs from 'fs/promises';
+import os from 'os';
+import path from 'path';
 import {
   analyzeLanguages,
   categorizeRepositories,
   createPieChartSvg,
   createBarChartSvg,
+  findGitRepos,
+  findProjectWebsites,
   resolveConfig,
   compileActivityData,
+  parseRepoLog,
   type RepoStats,
   type ResolvedConfig,
 } from '../../sidequest/workers/git-activity-collector.ts';
@@ -20,6 +26,7 @@ test('resolveConfig applies defaults when config is empty', () => {
   assert.ok(config.reportsDir.endsWith('/reports'));
   assert.equal(config.includeDotfiles, true);
   assert.equal(config.maxDepth, 3);
+  assert.equal(config.maxJobs, 8);
   assert.ok(config.excludePatterns.includes('node_modules'));
   assert.ok(Object.keys(config.languageMapping).length > 0);
 });
@@ -29,12 +36,14 @@ test('resolveConfig respects provided scanning values', () => {
     scanning: {
       code_directory: '/custom/code',
       max_depth: 5,
+      max_jobs: 2,
       include_dotfiles: false,
       exclude_patterns: ['foo'],
     },
   });
   assert.equal(config.codeDir, '/custom/code');
   assert.equal(config.maxDepth, 5);
+  assert.equal(config.maxJobs, 2);
   assert.equal(config.includeDotfiles, false);
   assert.deepEqual(config.excludePatterns, ['foo']);
 });
@@ -48,6 +57,104 @@ test('resolveConfig expands tilde in paths', () => {
   assert.ok(!config.personalSiteDir.includes('~'));
 });
 
+// ---------------------------------------------------------------------------
+// findGitRepos
+// ---------------------------------------------------------------------------
+test('findGitRepos walks to maxDepth and excludes whole path components', async (t) => {
+  const tmpDir = await fs.mkdtemp(path.join(os.tmpdir(), 'git-activity-collector-test-'));
+  t.after(async () => {
+    await fs.rm(tmpDir, { recursive: true, force: true });
+  });
+
+  for (const dir of ['app', 'user.github.io', 'group/lib', 'group/deep/too-far', 'node_modules/pkg']) {
+    await fs.mkdir(path.join(tmpDir, dir, '.git'), { recursive: true });
+  }
+
+  const config = resolveConfig({
+    scanning: {
+      code_directory: tmpDir,
+      reports_directory: path.join(tmpDir, 'missing'),
+      additional_repositories: [],
+      include_dotfiles: false,
+      max_depth: 3,
+      exclude_patterns: ['node_modules', '.git'],
+    },
+  });
+
+  const repos = await findGitRepos(config);
+  assert.deepEqual([...repos].sort(), ['app', 'group/lib', 'user.github.io'].map((r) => path.join(tmpDir, r)));
+});
+
+test('findGitRepos excludes only whole path components', async (t) => {
+  const tmpDir = await fs.mkdtemp(path.join(os.tmpdir(), 'git-activity-collector-test-'));
+  t.after(async () => {
+    await fs.rm(tmpDir, { recursive: true, force: true });
+  });
+
+  const dirs = ['rebuild', 'myvenv', 'foo.git', 'build/out', 'tools/venv', '.vim/bundle/plugin'];
+  for (const dir of dirs) {
+    await fs.mkdir(path.join(tmpDir, dir, '.git'), { recursive: true });
+  }
+
+  const config = resolveConfig({
+    scanning: {
+      code_directory: tmpDir,
+      reports_directory: path.join(tmpDir, 'missing'),
+      additional_repositories: [],
+      include_dotfiles: false,
+      max_depth: 4,
+      exclude_patterns: ['build', 'venv', '.git', 'vim/bundle'],
+    },
+  });
+
+  const repos = await findGitRepos(config);
+  assert.deepEqual([...repos].sort(), ['foo.git', 'myvenv', 'rebuild'].map((r) => path.join(tmpDir, r)));
+});
+
+// ---------------------------------------------------------------------------
+// parseRepoLog
+// ---------------------------------------------------------------------------
+test('parseRepoLog counts commits, months, files, languages and line changes in one pass', () => {
+  const stdout = [
+    '\x002025-02',
+    '3\t1\tsrc/index.ts',
+    '-\t-\tassets/logo.png',
+    '',
+    '\x002025-01',
+    '',
+    '\x002025-01',
+    '10\t0\tREADME.md',
+  ].join('\n');
+
+  const stats = parseRepoLog(stdout);
+  assert.equal(stats.commits, 3);
+  assert.deepEqual(stats.monthlyCommits, { '2025-02': 1, '2025-01': 2 });
+  assert.equal(stats.fileCount, 3);
+  assert.deepEqual(stats.languages, { 'TypeScript': 1, 'Images': 1, 'Markdown': 1 });
+  assert.equal(stats.additions, 13);
+  assert.equal(stats.deletions, 1);
+});
+
+test('parseRepoLog classifies renamed files by their new path', () => {
+  const stdout = [
+    '\x002025-01',
+    '0\t0\ttop.js => renamed.ts',
+    '0\t0\tlib/{old.js => new.ts}',
+    '0\t0\tlib/{old => new}/util.ts',
+    '0\t0\tlib/{ => nested}/a.ts',
+    '0\t0\tlib/{nested => }/b.ts',
+  ].join('\n');
+
+  const mapping = { 'JavaScript': ['.js'], 'TypeScript': ['.ts'] };
+  assert.deepEqual(parseRepoLog(stdout, mapping).languages, { 'TypeScript': 5 });
+});
+
+test('parseRepoLog handles empty output', () => {
+  assert.deepEqual(parseRepoLog(''), {
+    commits: 0, monthlyCommits: {}, fileCount: 0, languages: {}, additions: 0, deletions: 0,
+  });
+});
+
 // ---------------------------------------------------------------------------
 // analyzeLanguages
 // ---------------------------------------------------------------------------
@@ -81,6 +188,16 @@ test('analyzeLanguages handles full filename matches (lock files)', () => {
   assert.equal(result['Lock Files'], 2);
 });
 
+test('analyzeLanguages picks the earliest language matching extension or name', () => {
+  const mapping = {
+    'JSON': ['.json'],
+    'Lock Files': ['.lock', 'package-lock.json'],
+  };
+
+  const result = analyzeLanguages(['package-lock.json', 'yarn.lock'], mapping);
+  assert.deepEqual(result, { 'JSON': 1, 'Lock Files': 1 });
+});
+
 test('analyzeLanguages returns empty for no files', () => {
   const result = analyzeLanguages([], { 'TypeScript': ['.ts'] });
   assert.deepEqual(result, {});
@@ -101,7 +218,8 @@ function makeRepo(name: string, commits: number): RepoStats {
     parent: null,
     commits,
     monthlyCommits: {},
-    files: [],
+    fileCount: 0,
+    languages: {},
     additions: 0,
     deletions: 0,
   };
@@ -153,6 +271,19 @@ test('categorizeRepositories falls back to Client Work for unmatched repos', ()
   assert.equal(result['Client Work'].length, 1);
 });
 
+test('categorizeRepositories takes the Legacy threshold from config max_commits', () => {
+  const { projectCategories } = resolveConfig({
+    project_categories: {
+      'Tools': { keywords: ['tool'] },
+      'Legacy': { keywords: [], max_commits: 10 },
+    },
+  });
+
+  const result = categorizeRepositories([makeRepo('quiet', 8), makeRepo('busy', 12)], projectCategories);
+  assert.deepEqual(result['Legacy'], [{ name: 'quiet', commits: 8 }]);
+  assert.deepEqual(result['Client Work'], [{ name: 'busy', commits: 12 }]);
+});
+
 // ---------------------------------------------------------------------------
 // createPieChartSvg
 // ---------------------------------------------------------------------------
@@ -213,6 +344,29 @@ test('createBarChartSvg handles single entry', () => {
   assert.ok(svg.includes('42'));
 });
 
+// ---------------------------------------------------------------------------
+// findProjectWebsites
+// ---------------------------------------------------------------------------
+test('findProjectWebsites reads CNAME files and skips repos without one', async (t) => {
+  const tmpDir = await fs.mkdtemp(path.join(os.tmpdir(), 'git-activity-collector-test-'));
+  t.after(async () => {
+    await fs.rm(tmpDir, { recursive: true, force: true });
+  });
+
+  const site = { ...makeRepo('site', 3), path: path.join(tmpDir, 'site') };
+  const bare = { ...makeRepo('bare', 2), path: path.join(tmpDir, 'bare') };
+  const local = { ...makeRepo('local', 1), path: path.join(tmpDir, 'local') };
+  await fs.mkdir(site.path);
+  await fs.mkdir(bare.path);
+  await fs.mkdir(local.path);
+  await fs.writeFile(path.join(site.path, 'CNAME'), 'www.example.com\n');
+  await fs.writeFile(path.join(local.path, 'CNAME'), 'localhost');
+
+  assert.deepEqual(await findProjectWebsites([site, bare, local]), {
+    site: 'https://www.example.com',
+  });
+});
+
 // ---------------------------------------------------------------------------
 // compileActivityData
 // ---------------------------------------------------------------------------
@@ -224,7 +378,8 @@ test('compileActivityData aggregates stats correctly', () => {
       parent: null,
       commits: 10,
       monthlyCommits: { '2026-01': 6, '2026-02': 4 },
-      files: ['a.ts', 'b.ts'],
+      fileCount: 2,
+      languages: { 'TypeScript': 2 },
       additions: 100,
       deletions: 20,
     },
@@ -234,20 +389,22 @@ test('compileActivityData aggregates stats correctly', () => {
       parent: null,
       commits: 5,
       monthlyCommits: { '2026-01': 3, '2026-02': 2 },
-      files: ['c.py'],
+      fileCount: 1,
+      languages: { 'Python': 1 },
       additions: 50,
       deletions: 10,
     },
   ];
 
   const config = resolveConfig({});
-  const data = compileActivityData(repos, ['a.ts', 'b.ts', 'c.py'], '2026-01-01', '2026-02-28', config);
+  const data = compileActivityData(repos, '2026-01-01', '2026-02-28', config);
 
   assert.equal(data.total_commits, 15);
   assert.equal(data.total_additions, 150);
   assert.equal(data.total_deletions, 30);
   assert.equal(data.total_repositories, 2);
   assert.equal(data.total_files, 3);
+  assert.deepEqual(data.languages, { 'TypeScript': 2, 'Python': 1 });
   assert.equal(data.monthly['2026-01'], 9);
   assert.equal(data.monthly['2026-02'], 6);
   assert.equal(data.date_range.start, '2026-01-01');
@@ -256,6 +413,12 @@ test('compileActivityData aggregates stats correctly', () => {
 
 test('compileActivityData uses current date when untilDate is undefined', () => {
   const config = resolveConfig({});
-  const data = compileActivityData([], [], '2026-01-01', undefined, config);
+  const data = compileActivityData([], '2026-01-01', undefined, config);
   assert.ok(data.date_range.end.match(/^\d{4}-\d{2}-\d{2}$/));
 });
+
+test('compileActivityData ends an open range on the supplied clock reading', () => {
+  const config = resolveConfig({});
+  const data = compileActivityData([], '2026-01-01', undefined, config, new Date(2026, 2, 5));
+  assert.equal(data.date_range.end, '2026-03-05');
+});
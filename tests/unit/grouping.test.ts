@@ -217,6 +217,27 @@ describe('groupBySimilarity', () => {
     // This is expected to have fewer groups due to quality filtering.
     assert.ok(groups.length <= 1);
   });
+
+  it('should not merge a structural chain whose ends fail the line-ratio check', () => {
+    // 10/19 and 19/37 pass the 0.5 line ratio on their own; 10/37 does not
+    const blocks = [
+      ['cb_a', 'loadUsers', 'a.ts', 10],
+      ['cb_b', 'loadOrders', 'b.ts', 19],
+      ['cb_c', 'loadInvoices', 'c.ts', 37],
+    ].map(([blockId, name, filePath, lineCount]) =>
+      makeBlock({
+        blockId: blockId as string,
+        sourceCode: makeBlock().sourceCode.replace('processData', name as string),
+        tags: [`function:${name}`],
+        lineCount: lineCount as number,
+        location: { filePath: filePath as string, lineStart: 1, lineEnd: lineCount as number },
+      })
+    );
+    const groups = groupBySimilarity(blocks);
+    assert.equal(groups.length, 1);
+    assert.equal(groups[0].similarityMethod, 'structural');
+    assert.deepEqual(groups[0].memberBlockIds, ['cb_a', 'cb_b']);
+  });
 });
 
 // ---------------------------------------------------------------------------
@@ -88,6 +88,35 @@ describe('SemanticAnnotator', () => {
     });
   });
 
+  describe('extractAnnotations', () => {
+    it('should key annotations by blockId', () => {
+      const anns = annotator.extractAnnotations([
+        makeBlock('items.filter(x => x.ok);', { blockId: 'cb_1' }),
+        makeBlock('const data = await api.get("/users");', { blockId: 'cb_2' }),
+      ]);
+      assert.equal(anns.size, 2);
+      assert.ok(anns.get('cb_1')?.operations.has('filter'));
+      assert.ok(anns.get('cb_2')?.operations.has('read'));
+    });
+
+    it('should match extractAnnotation for each block', () => {
+      const block = makeBlock('if (!user) return null;', { blockId: 'cb_1', tags: ['function:getUser'] });
+      const anns = annotator.extractAnnotations([block]);
+      assert.deepEqual(anns.get('cb_1'), annotator.extractAnnotation(block));
+    });
+
+    it('should share annotations between blocks with identical content', () => {
+      const code = 'items.map(x => x.id);';
+      const anns = annotator.extractAnnotations([
+        makeBlock(code, { blockId: 'cb_1' }),
+        makeBlock(code, { blockId: 'cb_2' }),
+        makeBlock(code, { blockId: 'cb_3', category: 'validator' }),
+      ]);
+      assert.equal(anns.get('cb_1'), anns.get('cb_2'));
+      assert.notEqual(anns.get('cb_1'), anns.get('cb_3'));
+    });
+  });
+
   describe('intent inference', () => {
     it('should generate intent with operations and domains', () => {
       const block = makeBlock('const result = items.filter(x => x.active);');
@@ -19,10 +19,22 @@ import {
   compareMethodChains,
   calculateSemanticPenalty,
   calculateStructuralSimilarity,
+  buildStructuralProfile,
+  compareStructuralProfiles,
   areStructurallySimilar,
   type SemanticFeatures,
 } from '../../sidequest/pipeline-core/similarity/structural.ts';
 
+const PENALTY_TOLERANCE = 0.001;
+
+/** Tolerance comparison that reports both values on failure. */
+function assertClose(actual: number, expected: number, tolerance = PENALTY_TOLERANCE): void {
+  assert.ok(
+    Math.abs(actual - expected) < tolerance,
+    `expected ${actual} to be within ${tolerance} of ${expected}`
+  );
+}
+
 // ---------------------------------------------------------------------------
 // SemanticFeatures type shape
 // ---------------------------------------------------------------------------
@@ -106,6 +118,11 @@ describe('extractSemanticFeatures', () => {
     assert.ok(f.semanticMethods.has('Math.floor'));
     assert.ok(f.semanticMethods.has('Math.ceil'));
   });
+
+  it('should reuse the memoized result for repeated source', () => {
+    const code = 'if (a !== b) res.status(404).send();';
+    assert.equal(extractSemanticFeatures(code), extractSemanticFeatures(code));
+  });
 });
 
 // ---------------------------------------------------------------------------
@@ -156,6 +173,15 @@ describe('normalizeCode', () => {
     const b = 'const value = add(a, b);';
     assert.equal(normalizeCode(a), normalizeCode(b));
   });
+
+  it('should space operators and tighten punctuation', () => {
+    assert.equal(normalizeCode('if (a&&b) { return c+1; }'), 'var(var & & var){var var + NUM;}');
+  });
+
+  it('should not treat // inside a string literal as a comment', () => {
+    const result = normalizeCode("const url = 'https://example.com'; const x = 1;");
+    assert.equal(result, "var var = 'STR';var var = NUM;");
+  });
 });
 
 // ---------------------------------------------------------------------------
@@ -208,6 +234,14 @@ describe('calculateLevenshteinSimilarity', () => {
     const far = calculateLevenshteinSimilarity('hello', 'world');
     assert.ok(close > far);
   });
+
+  it('should match the LCS ratio for strings spanning several 32-bit words', () => {
+    // 'ba' * 40 is a subsequence of 'ab' * 50 (skip the leading 'a'), so LCS = 80
+    const a = 'ab'.repeat(50);
+    const b = 'ba'.repeat(40);
+    assert.equal(calculateLevenshteinSimilarity(a, b), (2 * 80) / (a.length + b.length));
+    assert.equal(calculateLevenshteinSimilarity(a, 'c'.repeat(70)), 0);
+  });
 });
 
 // ---------------------------------------------------------------------------
@@ -245,6 +279,16 @@ describe('extractLogicalOperators', () => {
     const ops = extractLogicalOperators('if (!done) {}');
     assert.ok(ops.has('!'));
   });
+
+  it('should detect strict and loose operators appearing in the same code', () => {
+    const ops = extractLogicalOperators('if (a !== b && c != d && e == f) {}');
+    assert.deepEqual([...ops].sort(), ['!=', '!==', '==']);
+  });
+
+  it('should not report == for code that only uses !==', () => {
+    const ops = extractLogicalOperators('a !== b');
+    assert.deepEqual([...ops], ['!==']);
+  });
 });
 
 // ---------------------------------------------------------------------------
@@ -338,6 +382,12 @@ describe('extractMethodChain', () => {
     const result = extractMethodChain('console.log("a")');
     assert.equal(result.length, 0);
   });
+
+  it('should split chains on calls further apart than the max gap', () => {
+    const filler = ' '.repeat(150);
+    const code = `a.b().c().d();${filler}x.y().z();`;
+    assert.deepEqual(extractMethodChain(code), ['b', 'c', 'd']);
+  });
 });
 
 // ---------------------------------------------------------------------------
@@ -373,6 +423,11 @@ describe('compareMethodChains', () => {
 // ---------------------------------------------------------------------------
 
 describe('calculateSemanticPenalty', () => {
+  it('should return 1.0 for the same features object', () => {
+    const f = extractSemanticFeatures('if (a === b) res.status(200); Math.max(a, b);');
+    assert.equal(calculateSemanticPenalty(f, f), 1.0);
+  });
+
   it('should return 1.0 when both features are empty', () => {
     const empty = extractSemanticFeatures('');
     assert.equal(calculateSemanticPenalty(empty, empty), 1.0);
@@ -383,7 +438,7 @@ describe('calculateSemanticPenalty', () => {
     const f2 = extractSemanticFeatures('res.status(404).json({})');
     const penalty = calculateSemanticPenalty(f1, f2);
     assert.ok(penalty < 1.0);
-    assert.ok(Math.abs(penalty - 0.70) < 0.001);
+    assertClose(penalty, 0.70);
   });
 
   it('should return 1.0 when status codes match', () => {
@@ -398,7 +453,7 @@ describe('calculateSemanticPenalty', () => {
     const f2 = extractSemanticFeatures('if (a !== b) {}');
     const penalty = calculateSemanticPenalty(f1, f2);
     assert.ok(penalty < 1.0);
-    assert.ok(Math.abs(penalty - 0.80) < 0.001);
+    assertClose(penalty, 0.80);
   });
 
   it('should apply semantic method penalty when methods differ', () => {
@@ -406,14 +461,14 @@ describe('calculateSemanticPenalty', () => {
     const f2 = extractSemanticFeatures('Math.min(a, b)');
     const penalty = calculateSemanticPenalty(f1, f2);
     assert.ok(penalty < 1.0);
-    assert.ok(Math.abs(penalty - 0.75) < 0.001);
+    assertClose(penalty, 0.75);
   });
 
   it('should compound multiple penalties when multiple features differ', () => {
     const f1 = extractSemanticFeatures('res.status(200); if (a === b) {}');
     const f2 = extractSemanticFeatures('res.status(404); if (a !== b) {}');
     const penalty = calculateSemanticPenalty(f1, f2);
-    assert.ok(Math.abs(penalty - 0.70 * 0.80) < 0.001);
+    assertClose(penalty, 0.70 * 0.80);
   });
 });
 
@@ -467,6 +522,14 @@ describe('calculateStructuralSimilarity', () => {
     assert.equal(labelLow, 'structural');
   });
 
+  it('should label pairs "different" when length alone rules out the threshold', () => {
+    const short = 'const x = compute(a);';
+    const long = Array.from({ length: 20 }, (_, i) => `const v${i} = compute(a, b, c);`).join('\n');
+    const [score, label] = calculateStructuralSimilarity(short, long);
+    assert.equal(label, 'different');
+    assert.ok(score < 0.90);
+  });
+
   it('should return score of 0.95 for normalised-identical code', () => {
     const a = 'const result = add(x, y); // comment';
     const b = 'const value = add(a, b);';
@@ -508,3 +571,39 @@ describe('areStructurallySimilar', () => {
     assert.equal(areStructurallySimilar(a, b, 1.0), false);
   });
 });
+
+// ---------------------------------------------------------------------------
+// compareStructuralProfiles
+// ---------------------------------------------------------------------------
+
+describe('buildStructuralProfile', () => {
+  it('should return the memoized profile for a repeated source', () => {
+    const code = 'items.filter(x => x.ok).map(x => x.id)';
+    const profile = buildStructuralProfile(code);
+    assert.equal(buildStructuralProfile(code), profile);
+    assert.equal(profile.normalized, normalizeCode(code));
+    assert.deepEqual(profile.methodChain, ['filter', 'map']);
+  });
+});
+
+describe('compareStructuralProfiles', () => {
+  const samples = [
+    'const user = await db.find(id); return res.status(200).json(user);',
+    'const item = await db.find(key); return res.status(404).json(item);',
+    'items.filter(x => x.active).map(x => x.id).join(",")',
+    'rows.filter(r => r.ok).map(r => r.name)',
+    '',
+  ];
+
+  it('should score every pair the same as calculateStructuralSimilarity', () => {
+    const profiles = samples.map(buildStructuralProfile);
+    for (let i = 0; i < samples.length; i++) {
+      for (let j = 0; j < samples.length; j++) {
+        assert.deepEqual(
+          compareStructuralProfiles(profiles[i], profiles[j], 0.5),
+          calculateStructuralSimilarity(samples[i], samples[j], 0.5)
+        );
+      }
+    }
+  });
+});